@@ -0,0 +1,276 @@
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import sys
+import threading
+import time
+from typing import Any, Callable, Optional
+import numpy as np
+from sqlalchemy import text
+from tabulate import tabulate
+
+from f1predictions.etl import extractor
+from f1predictions.etl.instrumentation import get_rss
+from f1predictions.etl.loader import load_frames
+from f1predictions.etl.views import create_views, drop_views
+from f1predictions.load import LOAD_STEPS, transform_step, bump_data_version
+from f1predictions.orm.config.database import clear_database, drop_indexes, create_indexes, analyze_tables, \
+    get_connection, get_engine, get_session
+from f1predictions.orm.config.statements import reset_statement_stats, format_statement_report
+from f1predictions.orm.dbal.featurestore import get_feature_store, DRIVERS_ROUNDS_RESULTS, DRIVERS_SEASONS_RESULTS
+from f1predictions.orm.query import DriverQuery, DriverRatingQuery, DriverCategoryQuery
+from f1predictions.prediction.classifiers import RandomForestClassifierBuilder, DecisionTreeClassifierBuilder, \
+    LogisticRegressionClassifierBuilder, LightGBMClassifierBuilder, KNNClassifierBuilder
+from f1predictions.prediction.modelfactory import DriverRatingsModelFactory
+from f1predictions.prediction.regressors import RandomForestRegressorBuilder, DecisionTreeRegressorBuilder, \
+    LinearRegressorBuilder
+
+STAGES = ['etl', 'views', 'features', 'models']
+
+REGRESSORS = {
+    'random forest regressor': lambda X, y: RandomForestRegressorBuilder().set_model(X, y)
+    .set_criterion('absolute_error').create_train_test_set(0.33).create_regressor(12),
+    'decision tree regressor': lambda X, y: DecisionTreeRegressorBuilder().set_model(X, y)
+    .set_criterion('absolute_error').create_train_test_set(0.33).create_regressor(10),
+    'linear regressor': lambda X, y: LinearRegressorBuilder().set_model(X, y)
+    .create_train_test_set(0.33).create_regressor(),
+}
+
+CLASSIFIERS = {
+    'random forest classifier': lambda X, y: RandomForestClassifierBuilder().set_model(X, y)
+    .set_criterion('gini').create_train_test_set(0.33).create_classifier(12),
+    'decision tree classifier': lambda X, y: DecisionTreeClassifierBuilder().set_model(X, y)
+    .set_criterion('gini').create_train_test_set(0.33).create_classifier(10),
+    'logistic regression classifier': lambda X, y: LogisticRegressionClassifierBuilder().set_model(X, y)
+    .create_train_test_set(0.33).create_classifier(),
+    'lightgbm classifier': lambda X, y: LightGBMClassifierBuilder().set_model(X, y)
+    .create_train_test_set(0.33).create_classifier(True),
+    'knn classifier': lambda X, y: KNNClassifierBuilder().set_model(X, y)
+    .create_train_test_set(0.33).create_classifier(10),
+}
+
+_RSS_SAMPLE_INTERVAL = 0.005
+_MIN_TIME_DIFFERENCE = 0.05
+_MIN_RSS_DIFFERENCE = 16.0
+
+
+class _PeakRssSampler:
+    def __init__(self):
+        self.peak = get_rss()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def __enter__(self) -> '_PeakRssSampler':
+        if self.peak is not None:
+            self._thread.start()
+
+        return self
+
+    def __exit__(self, *_):
+        if self.peak is None:
+            return
+
+        self._stopped.set()
+        self._thread.join()
+        self.peak = max(self.peak, get_rss())
+
+    def _sample(self):
+        while not self._stopped.wait(_RSS_SAMPLE_INTERVAL):
+            self.peak = max(self.peak, get_rss())
+
+
+def run_benchmarks(stages: Optional[list[str]] = None, pairs: int = 10000) -> dict:
+    stages = stages or STAGES
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        raise ValueError('Unknown stages {}, expected some of: {}'.format(unknown, ', '.join(STAGES)))
+
+    results = []
+    reset_statement_stats()
+    for stage in STAGES:
+        if stage in stages:
+            print('Benchmarking {}...'.format(stage))
+            _BENCHMARKS[stage](results, pairs)
+
+    return {'metadata': _get_metadata(), 'results': results}
+
+
+def compare(report: dict, baseline: dict, tolerance: float = 0.25) -> list[dict]:
+    baseline_results = {(result['stage'], result['name']): result for result in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        previous = baseline_results.get((result['stage'], result['name']))
+        if previous is None:
+            continue
+
+        for metric, min_difference in (('wall_time', _MIN_TIME_DIFFERENCE), ('peak_rss_mb', _MIN_RSS_DIFFERENCE)):
+            before, after = previous.get(metric), result.get(metric)
+            if before is None or after is None:
+                continue
+            if after > before * (1 + tolerance) and after - before > min_difference:
+                regressions.append({
+                    'stage': result['stage'],
+                    'name': result['name'],
+                    'metric': metric,
+                    'baseline': before,
+                    'current': after,
+                    'change': (after - before) / before if before else math.inf,
+                })
+
+    return regressions
+
+
+def format_results(report: dict) -> str:
+    return tabulate(
+        [{key: result[key] for key in ('stage', 'name', 'wall_time', 'rows', 'rows_per_sec', 'peak_rss_mb')}
+         for result in report['results']],
+        headers='keys', floatfmt='.3f'
+    )
+
+
+def benchmark_etl(results: list, _):
+    clear_database()
+    drop_indexes()
+    for step in LOAD_STEPS:
+        frames = _measure(results, 'etl', step.description + ' transform', lambda: list(transform_step(step)),
+                          lambda value: sum(len(frame) for frame in value))
+        _measure(results, 'etl', step.description + ' load', lambda: load_frames(frames, step.model),
+                 sum(len(frame) for frame in frames))
+        del frames
+
+    _measure(results, 'etl', 'indexes', lambda: (create_indexes(), analyze_tables()))
+    bump_data_version()
+
+
+def benchmark_views(results: list, _):
+    drop_views()
+    durations = _measure(results, 'views', 'create views', create_views)
+    for view, duration in durations.items():
+        rows = _count_rows(view)
+        results.append(_to_result('views', view, duration, rows, None))
+
+    bump_data_version()
+
+
+def benchmark_features(results: list, pairs: int):
+    store = get_feature_store()
+    store.invalidate()
+    season_pairs = _measure(results, 'features', 'feature store load', lambda: _get_all_pairs(store), len)
+    if not season_pairs:
+        raise ValueError('The results views are empty, run the etl and views stages first')
+
+    pairs = (season_pairs * math.ceil(pairs / len(season_pairs)))[:pairs]
+    factory = DriverRatingsModelFactory(DriverQuery(get_session()), store)
+    _measure(results, 'features', 'feature matrix', lambda: factory.build_batch(pairs), len(pairs))
+    _measure(results, 'features', 'driver ratings models', lambda: factory.create_driver_ratings_models(pairs),
+             len(pairs))
+
+
+def benchmark_models(results: list, _):
+    Session = get_session()
+    factory = DriverRatingsModelFactory(DriverQuery(Session))
+    ratings = DriverRatingQuery(Session).get_drivers_ratings()
+    X = factory.build_feature_matrix([(rating.driver_id, rating.year) for rating in ratings])
+    y = np.array([rating.rating for rating in ratings])
+    for name, create in REGRESSORS.items():
+        _benchmark_builder(results, name, create, X, y)
+
+    categories = DriverCategoryQuery(Session).get_drivers_categories()
+    batch = factory.build_batch([(category.driver_id, category.year) for category in categories])
+    batch.set_ratings(REGRESSORS['random forest regressor'](X, y).get().predict(batch.to_numpy()))
+    y = np.array([category.category.value for category in categories])
+    for name, create in CLASSIFIERS.items():
+        _benchmark_builder(results, name, create, batch.to_category_numpy(), y)
+
+
+_BENCHMARKS = {
+    'etl': benchmark_etl,
+    'views': benchmark_views,
+    'features': benchmark_features,
+    'models': benchmark_models,
+}
+
+
+def _benchmark_builder(results: list, name: str, create: Callable, X: np.ndarray, y: np.ndarray):
+    estimator = _measure(results, 'models', name + ' fit', lambda: create(X, y).get(), len(X))
+    _measure(results, 'models', name + ' predict', lambda: estimator.predict(X), len(X))
+
+
+def _measure(results: list, stage: str, name: str, function: Callable[[], Any],
+             rows: Optional[Any] = None) -> Any:
+    with _PeakRssSampler() as sampler:
+        start = time.perf_counter()
+        value = function()
+        wall_time = time.perf_counter() - start
+
+    rows = rows(value) if callable(rows) else rows
+    results.append(_to_result(stage, name, wall_time, rows, sampler.peak))
+
+    return value
+
+
+def _to_result(stage: str, name: str, wall_time: float, rows: Optional[int], peak_rss: Optional[int]) -> dict:
+    return {
+        'stage': stage,
+        'name': name,
+        'wall_time': wall_time,
+        'rows': rows,
+        'rows_per_sec': rows / wall_time if rows is not None and wall_time > 0 else None,
+        'peak_rss_mb': peak_rss / (1 << 20) if peak_rss is not None else None,
+    }
+
+
+def _get_all_pairs(store) -> list[tuple[int, int]]:
+    seasons = set(store.get_pairs(DRIVERS_SEASONS_RESULTS))
+
+    return [pair for pair in store.get_pairs(DRIVERS_ROUNDS_RESULTS) if pair in seasons]
+
+
+def _count_rows(view: str) -> int:
+    Connection = get_connection()
+    with Connection() as conn:
+        return conn.execute(text('SELECT COUNT(*) FROM {}'.format(view))).scalar()
+
+
+def _get_metadata() -> dict:
+    return {
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'database': get_engine().dialect.name,
+        'data_dir': os.path.abspath(extractor._DATADIR),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the ETL, views, feature and model stages. '
+                                                 'The etl stage clears the configured database.')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--data-dir', default=extractor._DATADIR)
+    parser.add_argument('--pairs', type=int, default=10000, help='Driver-seasons in the feature benchmark')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', help='Compare against results previously written with --output')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    arguments = parser.parse_args()
+
+    extractor._DATADIR = arguments.data_dir
+    report = run_benchmarks(arguments.stages, arguments.pairs)
+    print(format_results(report))
+    print(format_statement_report())
+
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if arguments.baseline:
+        with open(arguments.baseline) as file:
+            regressions = compare(report, json.load(file), arguments.tolerance)
+        if regressions:
+            print('Regressions against {}:'.format(arguments.baseline))
+            print(tabulate(regressions, headers='keys', floatfmt='.3f'))
+            sys.exit(1)
+        print('No regressions against {}'.format(arguments.baseline))
@@ -0,0 +1,28 @@
+from tabulate import tabulate
+from f1predictions.etl.views import create_views, drop_views
+from f1predictions.orm.config.database import drop_indexes, create_indexes, analyze_tables
+
+
+def benchmark_view_build() -> list[dict]:
+    results = []
+    for label, prepare in (('without indexes', _without_indexes), ('with indexes', _with_indexes)):
+        prepare()
+        drop_views()
+        durations = create_views()
+        results.append({'indexes': label, **durations, 'total': sum(durations.values())})
+
+    return results
+
+
+def _without_indexes():
+    drop_indexes()
+    analyze_tables()
+
+
+def _with_indexes():
+    create_indexes()
+    analyze_tables()
+
+
+if __name__ == '__main__':
+    print(tabulate(benchmark_view_build(), headers='keys', floatfmt='.3f'))
@@ -0,0 +1,153 @@
+import argparse
+import sys
+import numpy as np
+import pandas as pd
+
+from f1predictions.etl import extractor
+from f1predictions.etl.instrumentation import stage
+from f1predictions.etl.transformer import get_drivers_constructors_transformer, \
+    get_race_drivers_results_transformer, get_qualifying_results_transformer, get_drivers_standings_transformer, \
+    get_statuses_transformer
+from f1predictions.orm.dbal.featurestore import DRIVERS_ROUNDS_RESULTS, OPPONENTS_ROUNDS_RESULTS, \
+    DRIVERS_SEASONS_RESULTS, OPPONENTS_SEASONS_RESULTS, VIEWS, fetch_view
+
+# tables whose frames compute_views takes, in its argument order
+INPUT_TABLES = ['driver_constructor', 'race_driver_result', 'qualifying_result', 'race_driver_standings', 'status']
+
+_KEYS = ['driver_id', 'year']
+_RESULT_KEYS = ['round_id', 'driver_constructor_id']
+_ROUNDS_COUNTS = ['q2_appearances', 'q3_appearances', 'pole_positions', 'front_row_second', 'podiums', 'dnfs']
+
+
+def compute_views(driver_constructors: pd.DataFrame, drivers_results: pd.DataFrame,
+                  qualifying_results: pd.DataFrame, drivers_standings: pd.DataFrame,
+                  statuses: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    # sums are taken per driver_constructor first, so the teammate join fans out one row per teammate
+    # instead of one row per teammate result
+    seasons = _sum_seasons_results(drivers_standings)
+    rounds = _sum_rounds_results(drivers_results, qualifying_results, statuses)
+    drivers = driver_constructors[['id', 'driver_id', 'year']]
+    opponents = _get_opponents(driver_constructors)
+
+    return {
+        DRIVERS_SEASONS_RESULTS: _to_seasons_view(_sum_by_driver(drivers, seasons)),
+        OPPONENTS_SEASONS_RESULTS: _to_seasons_view(_sum_by_driver(opponents, seasons)),
+        DRIVERS_ROUNDS_RESULTS: _to_rounds_view(_sum_by_driver(drivers, rounds)),
+        OPPONENTS_ROUNDS_RESULTS: _to_rounds_view(_sum_by_driver(opponents, rounds)),
+    }
+
+
+def transform_views() -> dict[str, pd.DataFrame]:
+    # the transformers look up rounds and driver_constructor ids in the loaded tables, so this is for checking a loaded
+    # database; load_models(compute_views=True) computes the views from the frames it loads instead
+    with stage('transform views'):
+        frames = [
+            get_drivers_constructors_transformer().transform_to_frame(),
+            get_race_drivers_results_transformer().transform_to_frame(),
+            get_qualifying_results_transformer().transform_to_frame(),
+            get_drivers_standings_transformer().transform_to_frame(),
+            get_statuses_transformer().transform_to_frame(),
+        ]
+
+    with stage('compute views'):
+        return compute_views(*frames)
+
+
+def compare_with_views(views: dict[str, pd.DataFrame]) -> dict[str, int]:
+    return {view: _count_differences(views[view], fetch_view(view)) for view in VIEWS}
+
+
+def _sum_seasons_results(drivers_standings: pd.DataFrame) -> pd.DataFrame:
+    return drivers_standings.groupby('driver_constructor_id').agg(
+        season_points=('points', 'sum'),
+        position_sum=('position', 'sum'),
+        position_count=('position', 'count'),
+        wins=('wins', 'sum'),
+    )
+
+
+def _sum_rounds_results(drivers_results: pd.DataFrame, qualifying_results: pd.DataFrame,
+                        statuses: pd.DataFrame) -> pd.DataFrame:
+    finished = statuses.loc[
+        (statuses['status'] == 'Finished') | statuses['status'].str.contains('Lap', regex=False, na=False), 'id'
+    ]
+    rows = qualifying_results[_RESULT_KEYS + ['position', 'q2', 'q3']].merge(
+        drivers_results[_RESULT_KEYS + ['position', 'status_id']], on=_RESULT_KEYS, suffixes=('', '_race')
+    )
+    position, race_position = rows['position'], rows['position_race']
+
+    return pd.DataFrame({
+        'driver_constructor_id': rows['driver_constructor_id'],
+        'position_sum': position,
+        'position_count': position.notna(),
+        'q2_appearances': rows['q2'].notna() & (rows['q2'] != 0),
+        'q3_appearances': rows['q3'].notna() & (rows['q3'] != 0),
+        'pole_positions': position.where(position == 1, 0),
+        'front_row_second': position.where(position == 2, 0),
+        'podiums': (race_position <= 3) & (race_position > 0),
+        'dnfs': rows['status_id'].notna() & ~rows['status_id'].isin(finished),
+    }).groupby('driver_constructor_id').sum()
+
+
+def _get_opponents(driver_constructors: pd.DataFrame) -> pd.DataFrame:
+    # the id is the teammate's driver_constructor, the results of which count towards the driver
+    teammates = driver_constructors[['driver_id', 'constructor_id', 'year']].merge(
+        driver_constructors[['id', 'driver_id', 'constructor_id', 'year']],
+        on=['constructor_id', 'year'], suffixes=('', '_opponent')
+    )
+
+    return teammates.loc[teammates['driver_id'] != teammates['driver_id_opponent'], ['id', 'driver_id', 'year']]
+
+
+def _sum_by_driver(driver_constructors: pd.DataFrame, sums: pd.DataFrame) -> pd.DataFrame:
+    return driver_constructors.merge(sums, left_on='id', right_index=True).drop(columns='id') \
+        .groupby(_KEYS).sum()
+
+
+def _to_seasons_view(sums: pd.DataFrame) -> pd.DataFrame:
+    return _to_view(pd.DataFrame({
+        'season_points': sums['season_points'],
+        'season_position': _average(sums),
+        'wins': sums['wins'],
+    }))
+
+
+def _to_rounds_view(sums: pd.DataFrame) -> pd.DataFrame:
+    view = pd.DataFrame({'avg_qualifying_position': _average(sums)})
+    for column in _ROUNDS_COUNTS:
+        view[column] = sums[column].astype('int64')
+
+    return _to_view(view)
+
+
+def _average(sums: pd.DataFrame) -> pd.Series:
+    return sums['position_sum'].astype('float64') / sums['position_count'].where(sums['position_count'] > 0)
+
+
+def _to_view(view: pd.DataFrame) -> pd.DataFrame:
+    return view.reset_index().sort_values(['year', 'driver_id'], kind='stable').reset_index(drop=True)
+
+
+def _count_differences(computed: pd.DataFrame, expected: pd.DataFrame) -> int:
+    merged = computed.merge(expected, on=_KEYS, how='outer', suffixes=('', '_expected'), indicator=True)
+    different = (merged['_merge'] != 'both').to_numpy()
+    for column in computed.columns.drop(_KEYS):
+        values = merged[column].to_numpy(dtype='float64')
+        expected_values = merged[column + '_expected'].to_numpy(dtype='float64')
+        different |= ~np.isclose(values, expected_values, equal_nan=True)
+
+    return int(different.sum())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compute the results views in memory from the transformed frames '
+                                                 'and compare them with the views in the configured database.')
+    parser.add_argument('--data-dir', default=extractor._DATADIR)
+    arguments = parser.parse_args()
+
+    extractor._DATADIR = arguments.data_dir
+    differences = compare_with_views(transform_views())
+    for view, count in differences.items():
+        print('{}: {}'.format(view, 'matches' if 0 == count else '{} rows differ'.format(count)))
+    if any(differences.values()):
+        sys.exit(1)
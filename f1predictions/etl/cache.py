@@ -0,0 +1,217 @@
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import Iterator, Optional
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+
+_LOGGER = logging.getLogger(__name__)
+_CACHEDIR = os.environ.get('F1PREDICTIONS_CACHE_DIR', os.path.dirname(__file__) + '/../../.cache/csv')
+_NA_VALUES = ['\\N']
+_PARSE_CHUNK_SIZE = 100000
+_HASH_BLOCK_SIZE = 1 << 20
+_FORMAT_VERSION = 1
+_UNAVAILABLE_LOGGED = False
+
+
+def is_cache_available() -> bool:
+    global _UNAVAILABLE_LOGGED
+    if pa is None and not _UNAVAILABLE_LOGGED:
+        _UNAVAILABLE_LOGGED = True
+        _LOGGER.warning('pyarrow is not installed, CSV files are parsed on every read without the Arrow cache')
+
+    return pa is not None
+
+
+def read_csv(path: str, columns: list, dtypes: Optional[dict] = None) -> pd.DataFrame:
+    if not is_cache_available():
+        return _parse_csv(path, usecols=columns, dtype=dtypes)[columns]
+
+    return _to_frame(get_cached_table(path).select(columns), dtypes)
+
+
+def read_csv_chunks(path: str, columns: list, dtypes: Optional[dict], chunksize: int) -> Iterator[pd.DataFrame]:
+    if not is_cache_available():
+        with _parse_csv(path, usecols=columns, dtype=dtypes, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield chunk[columns]
+        return
+
+    table = get_cached_table(path).select(columns)
+    for offset in range(0, table.num_rows, chunksize):
+        yield _to_frame(table.slice(offset, chunksize), dtypes)
+
+
+def get_cached_table(path: str):
+    entry = _get_entry(path)
+    if not _is_fresh(path, entry):
+        _write_entry(path, entry)
+
+    with pa.memory_map(entry + '.arrow') as source:
+        return ipc.open_file(source).read_all()
+
+
+def warm_cache(directory: str):
+    for path in sorted(glob.glob(os.path.join(directory, '*.csv'))):
+        start = time.perf_counter()
+        table = get_cached_table(path)
+        print('Cached {} ({} rows) in {:.2f}s'.format(os.path.basename(path), table.num_rows,
+                                                       time.perf_counter() - start))
+
+
+def clear_cache():
+    shutil.rmtree(_CACHEDIR, ignore_errors=True)
+    print('Cleared {}'.format(os.path.abspath(_CACHEDIR)))
+
+
+def _parse_csv(path: str, **options):
+    return pd.read_csv(path, na_values=_NA_VALUES, **options)
+
+
+def _get_entry(path: str) -> str:
+    path = os.path.abspath(path)
+    name = os.path.splitext(os.path.basename(path))[0]
+
+    return os.path.join(_CACHEDIR, '{}-{}'.format(name, hashlib.sha1(path.encode()).hexdigest()[:12]))
+
+
+def _is_fresh(path: str, entry: str) -> bool:
+    manifest = _read_manifest(entry)
+    if manifest is None or manifest.get('version') != _FORMAT_VERSION or not os.path.exists(entry + '.arrow'):
+        return False
+
+    stat = os.stat(path)
+    if manifest['size'] != stat.st_size:
+        return False
+    if manifest['mtime_ns'] == stat.st_mtime_ns:
+        return True
+
+    # touched but possibly unchanged, e.g. after a fresh checkout
+    if manifest['sha256'] != _hash_file(path):
+        return False
+
+    _write_manifest(entry, {**manifest, 'mtime_ns': stat.st_mtime_ns})
+
+    return True
+
+
+def _write_entry(path: str, entry: str):
+    os.makedirs(_CACHEDIR, exist_ok=True)
+    stat = os.stat(path)
+    digest = _hash_file(path)
+
+    descriptor, temporary = tempfile.mkstemp(dir=_CACHEDIR, suffix='.tmp')
+    os.close(descriptor)
+    try:
+        try:
+            rows = _write_chunked(path, temporary)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # a later chunk inferred a type the first one could not hold, parse the whole file instead
+            rows = _write_whole(path, temporary)
+        os.replace(temporary, entry + '.arrow')
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+    _write_manifest(entry, {
+        'version': _FORMAT_VERSION,
+        'path': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': digest,
+        'rows': rows,
+    })
+
+
+def _write_chunked(path: str, destination: str) -> int:
+    rows = 0
+    writer, schema = None, None
+    try:
+        with _parse_csv(path, chunksize=_PARSE_CHUNK_SIZE) as reader:
+            for chunk in reader:
+                batch = pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False)
+                if writer is None:
+                    schema = batch.schema
+                    writer = ipc.new_file(destination, schema)
+                writer.write_batch(batch)
+                rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        return _write_whole(path, destination)
+
+    return rows
+
+
+def _write_whole(path: str, destination: str) -> int:
+    table = pa.Table.from_pandas(_parse_csv(path), preserve_index=False)
+    with ipc.new_file(destination, table.schema) as writer:
+        writer.write_table(table)
+
+    return table.num_rows
+
+
+def _to_frame(table, dtypes: Optional[dict]) -> pd.DataFrame:
+    df = table.to_pandas()
+    for column, dtype in (dtypes or {}).items():
+        if dtype is str:
+            values = df[column]
+            df[column] = values.astype(str).where(values.notna(), np.nan)
+        else:
+            df[column] = df[column].astype(dtype)
+
+    return df
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def _read_manifest(entry: str) -> Optional[dict]:
+    try:
+        with open(entry + '.json') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(entry: str, manifest: dict):
+    descriptor, temporary = tempfile.mkstemp(dir=_CACHEDIR, suffix='.tmp')
+    with os.fdopen(descriptor, 'w') as file:
+        json.dump(manifest, file)
+    os.replace(temporary, entry + '.json')
+
+
+if __name__ == '__main__':
+    from f1predictions.etl import extractor
+
+    parser = argparse.ArgumentParser(description='Manage the columnar cache of parsed source CSV files')
+    parser.add_argument('command', choices=['warm', 'clear'])
+    parser.add_argument('--data-dir', default=extractor._DATADIR)
+    arguments = parser.parse_args()
+
+    if 'clear' == arguments.command:
+        clear_cache()
+    elif not is_cache_available():
+        print('pyarrow is not installed, the CSV cache is disabled')
+    else:
+        warm_cache(arguments.data_dir)
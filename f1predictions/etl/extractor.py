@@ -1,20 +1,33 @@
+from typing import Iterator, Optional
 import pandas as pd
 import os.path
+from f1predictions.etl.cache import read_csv, read_csv_chunks
+from f1predictions.etl.instrumentation import stage, instrument_frames
 
 _DATADIR = os.path.dirname(__file__) + '/../../data'
 
 
 class Extractor:
-    def __init__(self, file: str, keys_to_export: list):
+    def __init__(self, file: str, keys_to_export: list, dtypes: Optional[dict] = None):
         self.file = file
         self.keys_to_export = keys_to_export
+        self.dtypes = dtypes
 
     def extract(self) -> pd.DataFrame:
         global _DATADIR
-        df = pd.read_csv(_DATADIR + '/' + self.file)
+        with stage('extract ' + self.file) as record:
+            df = read_csv(_DATADIR + '/' + self.file, self.keys_to_export, self.dtypes)
+            record.rows_out = len(df)
 
         return df[self.keys_to_export]
 
+    def extract_chunks(self, chunksize: int) -> Iterator[pd.DataFrame]:
+        global _DATADIR
+        return instrument_frames(
+            'extract ' + self.file,
+            read_csv_chunks(_DATADIR + '/' + self.file, self.keys_to_export, self.dtypes, chunksize)
+        )
+
 
 class DirectDataFrameExtractor(Extractor):
     def __init__(self, df: pd.DataFrame):
@@ -22,3 +35,7 @@ class DirectDataFrameExtractor(Extractor):
 
     def extract(self) -> pd.DataFrame:
         return self.dataframe
+
+    def extract_chunks(self, chunksize: int) -> Iterator[pd.DataFrame]:
+        for offset in range(0, len(self.dataframe), chunksize):
+            yield self.dataframe.iloc[offset:offset + chunksize]
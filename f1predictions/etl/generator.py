@@ -0,0 +1,295 @@
+import argparse
+import csv
+import datetime
+import os
+from contextlib import ExitStack
+from typing import Optional
+import numpy as np
+
+_NULL = '\\N'
+_POINTS = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+_STATUSES = ['Finished', '+1 Lap', '+2 Laps', 'Disqualified', 'Accident', 'Collision', 'Engine', 'Gearbox',
+             'Hydraulics', 'Brakes', 'Suspension', 'Power Unit']
+_FINISHED = 1
+_FIRST_RETIREMENT = 4
+_URL = 'http://en.wikipedia.org/wiki/{}'
+
+HEADERS = {
+    'drivers': ['driverId', 'driverRef', 'number', 'code', 'forename', 'surname', 'dob', 'nationality', 'url'],
+    'constructors': ['constructorId', 'constructorRef', 'name', 'nationality', 'url'],
+    'status': ['statusId', 'status'],
+    'circuits': ['circuitId', 'circuitRef', 'name', 'location', 'country', 'lat', 'lng', 'alt', 'url'],
+    'seasons': ['year', 'url'],
+    'races': ['raceId', 'year', 'round', 'circuitId', 'name', 'date', 'time', 'url', 'fp1_date', 'fp1_time',
+              'fp2_date', 'fp2_time', 'fp3_date', 'fp3_time', 'quali_date', 'quali_time', 'sprint_date',
+              'sprint_time'],
+    'results': ['resultId', 'raceId', 'driverId', 'constructorId', 'number', 'grid', 'position', 'positionText',
+                'positionOrder', 'points', 'laps', 'time', 'milliseconds', 'fastestLap', 'rank', 'fastestLapTime',
+                'fastestLapSpeed', 'statusId'],
+    'constructor_results': ['constructorResultsId', 'raceId', 'constructorId', 'points', 'status'],
+    'qualifying': ['qualifyId', 'raceId', 'driverId', 'constructorId', 'number', 'position', 'q1', 'q2', 'q3'],
+    'lap_times': ['raceId', 'driverId', 'lap', 'position', 'time', 'milliseconds'],
+    'pit_stops': ['raceId', 'driverId', 'stop', 'lap', 'time', 'duration', 'milliseconds'],
+    'power_rankings': ['driverId', 'year', 'rank'],
+    'driver_categories': ['driverId', 'year', 'category'],
+}
+
+
+class SyntheticDataGenerator:
+    def __init__(self, seasons: int = 10, first_year: int = 2000, constructors: int = 10, races: int = 22,
+                 laps: int = 60, driver_turnover: float = 0.15, retirement_rate: float = 0.08,
+                 seed: Optional[int] = None):
+        if seasons < 1 or constructors < 2 or races < 1 or laps < 2:
+            raise ValueError('At least 1 season, 2 constructors, 1 race and 2 laps are required')
+        if not 0 <= driver_turnover <= 1 or not 0 <= retirement_rate < 1:
+            raise ValueError('Driver turnover must be between 0 and 1 and retirement rate below 1')
+
+        self.seasons = seasons
+        self.first_year = first_year
+        self.constructors = constructors
+        self.races = races
+        self.laps = laps
+        self.driver_turnover = driver_turnover
+        self.retirement_rate = retirement_rate
+        self.seed = seed
+        self._random = np.random.default_rng(seed)
+
+    @property
+    def grid_size(self) -> int:
+        return 2 * self.constructors
+
+    def write(self, directory: str) -> dict[str, int]:
+        os.makedirs(directory, exist_ok=True)
+        counts = {name: 0 for name in HEADERS}
+        with ExitStack() as stack:
+            writers = {}
+            for name, header in HEADERS.items():
+                file = stack.enter_context(open(os.path.join(directory, name + '.csv'), 'w', newline=''))
+                writers[name] = csv.writer(file, lineterminator='\n')
+                writers[name].writerow(header)
+
+            def write(name: str, rows):
+                rows = list(rows)
+                writers[name].writerows(rows)
+                counts[name] += len(rows)
+
+            self._generate(write)
+
+        return counts
+
+    def _generate(self, write):
+        random = self._random
+        write('status', enumerate(_STATUSES, 1))
+        write('constructors', (
+            (i, 'constructor_{}'.format(i), 'Constructor {}'.format(i), 'Synthetic',
+             _URL.format('Constructor_{}'.format(i)))
+            for i in range(1, self.constructors + 1)
+        ))
+        write('circuits', (
+            (i, 'circuit_{}'.format(i), 'Circuit {}'.format(i), 'City {}'.format(i), 'Country {}'.format(i),
+             round(random.uniform(-60, 60), 4), round(random.uniform(-180, 180), 4), int(random.integers(0, 800)),
+             _URL.format('Circuit_{}'.format(i)))
+            for i in range(1, self.races + 1)
+        ))
+
+        drivers = np.arange(1, self.grid_size + 1)
+        skills = {int(driver): random.normal() for driver in drivers}
+        next_driver = self.grid_size + 1
+        race_id, result_id, constructor_result_id, qualify_id = 1, 1, 1, 1
+
+        for year in range(self.first_year, self.first_year + self.seasons):
+            if year != self.first_year:
+                replaced = random.random(len(drivers)) < self.driver_turnover
+                for i in np.flatnonzero(replaced):
+                    drivers[i] = next_driver
+                    skills[next_driver] = random.normal()
+                    next_driver += 1
+                drivers = random.permutation(drivers)
+
+            # two seats per constructor, the car matters as much as the driver
+            teams = np.repeat(np.arange(1, self.constructors + 1), 2)
+            cars = random.normal(size=self.constructors)
+            pace = np.array([skills[int(driver)] for driver in drivers]) + cars[teams - 1]
+            write('seasons', [(year, _URL.format('{}_Formula_One_season'.format(year)))])
+            season_points = np.zeros(len(drivers))
+
+            for round_number in range(1, self.races + 1):
+                date = datetime.date(year, 3, 1) + datetime.timedelta(days=7 * (round_number - 1))
+                name = 'Circuit {} Grand Prix'.format(round_number)
+                write('races', [(race_id, year, round_number, round_number, name, date.isoformat(), '14:00:00',
+                                 _URL.format('{}_{}'.format(year, name.replace(' ', '_'))))
+                                + (_NULL,) * 10])
+
+                race = self._generate_race(race_id, drivers, teams, pace)
+                season_points += race['points']
+                write('qualifying', self._qualifying_rows(race, qualify_id, drivers, teams))
+                write('results', self._results_rows(race, result_id, drivers, teams))
+                write('constructor_results', (
+                    (constructor_result_id + i, race_id, constructor, race['points'][teams == constructor].sum(), _NULL)
+                    for i, constructor in enumerate(range(1, self.constructors + 1))
+                ))
+                write('lap_times', self._lap_times_rows(race, drivers))
+                write('pit_stops', self._pit_stops_rows(race, drivers, date))
+
+                qualify_id += len(drivers)
+                result_id += len(drivers)
+                constructor_result_id += self.constructors
+                race_id += 1
+
+            write('power_rankings', self._power_rankings_rows(year, drivers, pace))
+            write('driver_categories', self._driver_categories_rows(year, drivers, season_points))
+
+        write('drivers', (
+            (driver, 'driver_{}'.format(driver), driver % 100, 'D{:02d}'.format(driver % 100),
+             'Driver', 'Number {}'.format(driver), '19{:02d}-01-01'.format(70 + driver % 30), 'Synthetic',
+             _URL.format('Driver_{}'.format(driver)))
+            for driver in range(1, next_driver)
+        ))
+
+    def _generate_race(self, race_id: int, drivers: np.ndarray, teams: np.ndarray, pace: np.ndarray) -> dict:
+        random = self._random
+        size = len(drivers)
+        grid = np.empty(size, dtype='int64')
+        grid[np.argsort(-(pace + random.normal(scale=0.5, size=size)))] = np.arange(1, size + 1)
+
+        base_lap = int(random.integers(75000, 105000))
+        lap_times = base_lap + np.round(
+            (-pace[:, None] * 300) + random.gamma(2.0, 250.0, size=(size, self.laps))
+        ).astype('int64')
+        retired = random.random(size) < self.retirement_rate
+        laps = np.where(retired, random.integers(0, self.laps, size=size), self.laps)
+        totals = np.where(np.arange(self.laps)[None, :] < laps[:, None], lap_times, 0).cumsum(axis=1)
+
+        # classified drivers first by distance then by time, retirements after them by distance covered
+        order = np.lexsort((totals[np.arange(size), np.maximum(laps - 1, 0)], -laps, retired))
+        position_order = np.empty(size, dtype='int64')
+        position_order[order] = np.arange(1, size + 1)
+        points = np.zeros(size)
+        scoring = (position_order <= len(_POINTS)) & ~retired
+        points[scoring] = np.array(_POINTS)[position_order[scoring] - 1]
+
+        return {
+            'race_id': race_id,
+            'grid': grid,
+            'lap_times': lap_times,
+            'totals': totals,
+            'laps': laps,
+            'retired': retired,
+            'position_order': position_order,
+            'points': points,
+            'base_lap': base_lap,
+        }
+
+    def _qualifying_rows(self, race: dict, first_id: int, drivers: np.ndarray, teams: np.ndarray):
+        random = self._random
+        for i in np.argsort(race['grid']):
+            position = int(race['grid'][i])
+            q1 = race['base_lap'] - 2000 + position * 100 + int(random.integers(0, 100))
+            yield (
+                first_id + position - 1, race['race_id'], drivers[i], teams[i], drivers[i] % 100, position,
+                _format_lap_time(q1),
+                _format_lap_time(q1 - 400) if position <= 15 else _NULL,
+                _format_lap_time(q1 - 800) if position <= 10 else _NULL,
+            )
+
+    def _results_rows(self, race: dict, first_id: int, drivers: np.ndarray, teams: np.ndarray):
+        totals, laps, lap_times = race['totals'], race['laps'], race['lap_times']
+        winner = np.flatnonzero(race['position_order'] == 1)[0]
+        winner_time = int(totals[winner, -1])
+        fastest = np.where(laps > 0, np.where(np.arange(self.laps)[None, :] < laps[:, None], lap_times,
+                                              np.iinfo('int64').max).min(axis=1), 0)
+        fastest_rank = np.empty(len(drivers), dtype='int64')
+        fastest_rank[np.lexsort((fastest, laps == 0))] = np.arange(1, len(drivers) + 1)
+
+        for i in np.argsort(race['position_order']):
+            position_order = int(race['position_order'][i])
+            retired = bool(race['retired'][i])
+            if retired:
+                status, time, milliseconds = _FIRST_RETIREMENT + int(i % (len(_STATUSES) - _FIRST_RETIREMENT)), \
+                    _NULL, _NULL
+            elif position_order == 1:
+                status, time, milliseconds = _FINISHED, _format_race_time(winner_time), winner_time
+            else:
+                status, milliseconds = _FINISHED, int(totals[i, -1])
+                time = '+{:.3f}'.format((milliseconds - winner_time) / 1000)
+            has_lap = laps[i] > 0
+
+            yield (
+                first_id + position_order - 1, race['race_id'], drivers[i], teams[i], drivers[i] % 100,
+                race['grid'][i],
+                _NULL if retired else position_order,
+                'R' if retired else position_order,
+                position_order, race['points'][i], laps[i], time, milliseconds,
+                int(np.argmin(lap_times[i, :laps[i]])) + 1 if has_lap else _NULL,
+                fastest_rank[i] if has_lap else _NULL,
+                _format_lap_time(int(fastest[i])) if has_lap else _NULL,
+                '{:.3f}'.format(5000 * 3600 / fastest[i]) if has_lap else _NULL,
+                status,
+            )
+
+    def _lap_times_rows(self, race: dict, drivers: np.ndarray):
+        totals, laps = race['totals'], race['laps']
+        for lap in range(self.laps):
+            running = np.flatnonzero(laps > lap)
+            ranking = running[np.argsort(totals[running, lap], kind='stable')]
+            for position, i in enumerate(ranking, 1):
+                milliseconds = int(race['lap_times'][i, lap])
+                yield race['race_id'], drivers[i], lap + 1, position, _format_lap_time(milliseconds), milliseconds
+
+    def _pit_stops_rows(self, race: dict, drivers: np.ndarray, date: datetime.date):
+        random = self._random
+        start = datetime.datetime.combine(date, datetime.time(14, 0))
+        for i in range(len(drivers)):
+            stops = np.sort(random.choice(np.arange(1, self.laps), size=min(int(random.integers(1, 4)), self.laps - 1),
+                                          replace=False))
+            for stop, lap in enumerate(stops[stops < race['laps'][i]], 1):
+                milliseconds = int(random.integers(19000, 30000))
+                time = start + datetime.timedelta(milliseconds=int(race['totals'][i, lap - 1]))
+                yield race['race_id'], drivers[i], stop, lap, time.strftime('%H:%M:%S'), \
+                    '{:.3f}'.format(milliseconds / 1000), milliseconds
+
+    @staticmethod
+    def _power_rankings_rows(year: int, drivers: np.ndarray, pace: np.ndarray):
+        # ratings between 5 and 10 following the combined driver and car pace
+        ratings = 5 + 5 * (pace - pace.min()) / max(np.ptp(pace), 1e-9)
+        for driver, rating in zip(drivers, ratings):
+            yield driver, year, round(float(rating), 2)
+
+    @staticmethod
+    def _driver_categories_rows(year: int, drivers: np.ndarray, season_points: np.ndarray):
+        positions = np.empty(len(drivers), dtype='int64')
+        positions[np.argsort(-season_points, kind='stable')] = np.arange(1, len(drivers) + 1)
+        categories = np.select([positions <= 2, positions <= 6, season_points > 0], [0, 1, 2], 3)
+        for driver, category in zip(drivers, categories):
+            yield driver, year, category
+
+
+def generate(directory: str, seed: Optional[int] = None, **options) -> dict[str, int]:
+    return SyntheticDataGenerator(seed=seed, **options).write(directory)
+
+
+def _format_lap_time(milliseconds: int) -> str:
+    return '{}:{:02d}.{:03d}'.format(milliseconds // 60000, milliseconds // 1000 % 60, milliseconds % 1000)
+
+
+def _format_race_time(milliseconds: int) -> str:
+    return '{}:{:02d}:{:02d}.{:03d}'.format(milliseconds // 3600000, milliseconds // 60000 % 60,
+                                            milliseconds // 1000 % 60, milliseconds % 1000)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write synthetic, referentially consistent Ergast-shaped CSV files')
+    parser.add_argument('directory')
+    parser.add_argument('--seasons', type=int, default=10)
+    parser.add_argument('--first-year', type=int, default=2000)
+    parser.add_argument('--constructors', type=int, default=10, help='Two drivers are entered per constructor')
+    parser.add_argument('--races', type=int, default=22, help='Races per season')
+    parser.add_argument('--laps', type=int, default=60, help='Laps per race')
+    parser.add_argument('--seed', type=int)
+    arguments = parser.parse_args()
+
+    counts = generate(arguments.directory, arguments.seed, seasons=arguments.seasons,
+                      first_year=arguments.first_year, constructors=arguments.constructors,
+                      races=arguments.races, laps=arguments.laps)
+    for name, count in counts.items():
+        print('{}.csv: {} rows'.format(name, count))
@@ -0,0 +1,350 @@
+import cProfile
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Optional
+from tabulate import tabulate
+
+from f1predictions.orm.config.statements import add_timing_listener
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+try:
+    import resource
+except ImportError:
+    # Windows has neither /proc nor getrusage, stages are recorded without their peak memory there
+    resource = None
+
+PROFILERS = ['cprofile', 'pyinstrument']
+
+_LOGGER = logging.getLogger(__name__)
+_PROFILER = os.environ.get('F1PREDICTIONS_PROFILE') or None
+_PROFILE_DIR = os.environ.get('F1PREDICTIONS_PROFILE_DIR', os.path.dirname(__file__) + '/../../.cache/profiles')
+_MEMORY_SAMPLE_INTERVAL = 0.01
+
+_RECORDS = []
+_RECORDS_LOCK = threading.Lock()
+_LOCAL = threading.local()
+
+
+class StageRecord:
+    def __init__(self, name: str, parent: Optional['StageRecord'], rows_in: Optional[int] = None):
+        self.name = name
+        self.parent_record = parent
+        self.parent = parent.name if parent is not None else None
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.thread = threading.current_thread().name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.child_time = 0.0
+        self.db_time = 0.0
+        self.db_statements = 0
+        self.peak_rss = get_rss()
+        self.profile = None
+
+    @property
+    def self_time(self) -> float:
+        return max(self.duration - self.child_time, 0.0)
+
+    def to_dict(self) -> dict:
+        return {
+            'stage': self.name,
+            'parent': self.parent,
+            'thread': self.thread,
+            'started_at': self.started_at,
+            'duration': self.duration,
+            'self_time': self.self_time,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'peak_rss_mb': self.peak_rss / (1 << 20) if self.peak_rss is not None else None,
+            'db_time': self.db_time,
+            'db_statements': self.db_statements,
+            'profile': self.profile,
+        }
+
+
+class _MemoryMonitor:
+    def __init__(self):
+        self._open = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, record: StageRecord):
+        if record.peak_rss is None:
+            return
+
+        with self._lock:
+            self._open.add(record)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample, name='stage-memory', daemon=True)
+                self._thread.start()
+
+    def remove(self, record: StageRecord):
+        if record.peak_rss is None:
+            return
+
+        with self._lock:
+            self._open.discard(record)
+        record.peak_rss = max(record.peak_rss, get_rss())
+
+    def _sample(self):
+        while True:
+            time.sleep(_MEMORY_SAMPLE_INTERVAL)
+            rss = get_rss()
+            with self._lock:
+                if not self._open:
+                    self._thread = None
+                    return
+                for record in self._open:
+                    record.peak_rss = max(record.peak_rss, rss)
+
+
+_MEMORY_MONITOR = _MemoryMonitor()
+
+
+def configure_profiling(profiler: Optional[str], directory: Optional[str] = None):
+    global _PROFILER, _PROFILE_DIR
+    if profiler is not None and profiler not in PROFILERS:
+        raise ValueError('Unknown profiler {}, expected one of: {}'.format(profiler, ', '.join(PROFILERS)))
+    if 'pyinstrument' == profiler and pyinstrument is None:
+        raise ValueError('pyinstrument is not installed')
+
+    _PROFILER = profiler
+    _PROFILE_DIR = directory or _PROFILE_DIR
+
+
+@contextmanager
+def stage(name: str, rows_in: Optional[int] = None, profile: bool = True) -> Iterator[StageRecord]:
+    record = _open(name, rows_in)
+    profiler = _start_profiler() if profile else None
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        elapsed = time.perf_counter() - start
+        if profiler is not None:
+            record.profile = _stop_profiler(profiler, name)
+        _close(record, elapsed)
+
+
+def instrument(name: Optional[str] = None, rows_out: Optional[Callable[[Any], int]] = None):
+    def decorator(function):
+        def wrapper(*args, **kwargs):
+            with stage(name or function.__qualname__) as record:
+                result = function(*args, **kwargs)
+                if rows_out is not None:
+                    record.rows_out = rows_out(result)
+
+                return result
+
+        wrapper.__name__ = function.__name__
+        wrapper.__qualname__ = function.__qualname__
+        wrapper.__wrapped__ = function
+
+        return wrapper
+
+    return decorator
+
+
+def instrument_frames(name: str, frames: Iterable) -> Iterator:
+    # only the time spent producing each frame counts, the consumer's work between frames does not
+    iterator = iter(frames)
+    record = None
+    try:
+        while True:
+            if record is None:
+                record = _open(name, None)
+                record.rows_out = 0
+            else:
+                _push(record)
+            start = time.perf_counter()
+            try:
+                frame = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                record.duration += time.perf_counter() - start
+                _pop(record)
+            record.rows_out += len(frame)
+
+            yield frame
+    finally:
+        if record is not None:
+            _close(record, 0.0)
+
+
+@contextmanager
+def database_call() -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _add_db_time(time.perf_counter() - start)
+
+
+def get_records(since: int = 0) -> list[StageRecord]:
+    with _RECORDS_LOCK:
+        return _RECORDS[since:]
+
+
+def get_record_count() -> int:
+    with _RECORDS_LOCK:
+        return len(_RECORDS)
+
+
+def add_records(records: list[StageRecord]):
+    with _RECORDS_LOCK:
+        _RECORDS.extend(records)
+
+
+def reset_records():
+    with _RECORDS_LOCK:
+        _RECORDS.clear()
+
+
+def format_summary(records: Optional[list[StageRecord]] = None) -> str:
+    records = get_records() if records is None else records
+    rows = [
+        [
+            '. ' * record.depth + record.name,
+            record.duration,
+            record.self_time,
+            record.rows_in,
+            record.rows_out,
+            record.rows_out / record.duration if record.rows_out is not None and record.duration > 0 else None,
+            record.peak_rss / (1 << 20) if record.peak_rss is not None else None,
+            record.db_time,
+            record.db_statements,
+        ]
+        for record in _in_tree_order(records)
+    ]
+
+    return tabulate(rows, headers=['stage', 'duration', 'self', 'rows in', 'rows out', 'rows/s', 'peak MB',
+                                   'db time', 'statements'], floatfmt='.2f')
+
+
+def _in_tree_order(records: list[StageRecord]) -> list[StageRecord]:
+    # records are appended when a stage ends, so children come before their parents and threads interleave
+    included = {id(record) for record in records}
+    children = {}
+    for record in sorted(records, key=lambda record: record.started_at):
+        parent = record.parent_record if record.parent_record is not None \
+            and id(record.parent_record) in included else None
+        children.setdefault(id(parent) if parent is not None else None, []).append(record)
+
+    ordered = []
+    pending = list(reversed(children.get(None, [])))
+    while pending:
+        record = pending.pop()
+        ordered.append(record)
+        pending.extend(reversed(children.get(id(record), [])))
+
+    return ordered
+
+
+def _open(name: str, rows_in: Optional[int]) -> StageRecord:
+    stack = _get_stack()
+    record = StageRecord(name, stack[-1] if stack else None, rows_in)
+    stack.append(record)
+    _MEMORY_MONITOR.add(record)
+
+    return record
+
+
+def _close(record: StageRecord, elapsed: float):
+    stack = _get_stack()
+    if stack and stack[-1] is record:
+        stack.pop()
+    record.duration += elapsed
+    if stack:
+        stack[-1].child_time += record.duration
+    _MEMORY_MONITOR.remove(record)
+
+    with _RECORDS_LOCK:
+        _RECORDS.append(record)
+    if _LOGGER.isEnabledFor(logging.INFO):
+        _LOGGER.info(json.dumps(record.to_dict()))
+
+
+def _push(record: StageRecord):
+    _get_stack().append(record)
+
+
+def _pop(record: StageRecord):
+    stack = _get_stack()
+    if stack and stack[-1] is record:
+        stack.pop()
+
+
+def _get_stack() -> list[StageRecord]:
+    if not hasattr(_LOCAL, 'stack'):
+        _LOCAL.stack = []
+
+    return _LOCAL.stack
+
+
+def _add_db_time(elapsed: float):
+    for record in _get_stack():
+        record.db_time += elapsed
+        record.db_statements += 1
+
+
+def _start_profiler():
+    if _PROFILER is None or getattr(_LOCAL, 'profiling', False):
+        return None
+
+    _LOCAL.profiling = True
+    if 'pyinstrument' == _PROFILER:
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    return profiler
+
+
+def _stop_profiler(profiler, name: str) -> str:
+    _LOCAL.profiling = False
+    os.makedirs(_PROFILE_DIR, exist_ok=True)
+    path = os.path.join(_PROFILE_DIR, '{}-{}-{}'.format(
+        re.sub(r'[^\w.-]+', '_', name), os.getpid(), time.strftime('%Y%m%d%H%M%S')
+    ))
+
+    if 'pyinstrument' == _PROFILER:
+        profiler.stop()
+        path += '.html'
+        with open(path, 'w') as file:
+            file.write(profiler.output_html())
+    else:
+        profiler.disable()
+        path += '.prof'
+        profiler.dump_stats(path)
+
+    return os.path.abspath(path)
+
+
+def get_rss() -> Optional[int]:
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        if resource is None:
+            return None
+
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        return maxrss if 'darwin' == sys.platform else maxrss * 1024
+
+
+add_timing_listener(_add_db_time)
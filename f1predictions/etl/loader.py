@@ -1,9 +1,108 @@
-from typing import Generator, Any
-from sqlalchemy import text
+import csv
+import enum
+import io
+import itertools
+import time
+from typing import Generator, Any, Iterable, Iterator, Callable
+import pandas as pd
+from sqlalchemy import text, inspect, insert, delete, select, func, Table, Connection, Enum, Integer, Float, \
+    String
+from sqlalchemy.dialects import postgresql, sqlite
+from f1predictions.etl.instrumentation import stage, database_call
 from f1predictions.orm.config.database import get_session, get_connection
 
+_BATCH_SIZE = 10000
+_COPY_NULL = '\\N'
 
-def load_data(models: Generator[Any, None, None]):
+
+def load_data(models: Generator[Any, None, None], bulk: bool = True):
+    if not bulk:
+        _load_data_with_session(models)
+        return
+
+    Connection = get_connection()
+    with Connection() as conn, conn.begin():
+        for model_class, group in itertools.groupby(models, key=type):
+            table = model_class.__table__
+            with stage('load ' + table.name) as record:
+                start = time.perf_counter()
+                count = _write_rows(conn, table, _to_rows(model_class, group))
+                record.rows_in = count
+                _report(table, count, time.perf_counter() - start)
+
+
+def load_frame(frame: pd.DataFrame, model: type):
+    load_frames([frame], model)
+
+
+def load_frames(frames: Iterable[pd.DataFrame], model: type, report: bool = True):
+    table = model.__table__
+
+    Connection = get_connection()
+    with stage('load ' + table.name) as record, Connection() as conn, conn.begin():
+        start = time.perf_counter()
+        count = 0
+        for frame in frames:
+            _write_frame(conn, table, frame)
+            count += len(frame)
+
+        record.rows_in = count
+        if report:
+            _report(table, count, time.perf_counter() - start)
+
+
+def upsert_frame(frame: pd.DataFrame, model: type) -> pd.DataFrame:
+    return upsert_frames([frame], model)
+
+
+def upsert_frames(frames: Iterable[pd.DataFrame], model: type) -> pd.DataFrame:
+    table = model.__table__
+    keys = _get_primary_key(table)
+
+    Connection = get_connection()
+    with stage('upsert ' + table.name) as record, Connection() as conn, conn.begin():
+        start = time.perf_counter()
+        count = 0
+        changed = []
+        for frame in frames:
+            # each chunk is compared with the stored rows in its key range only, not with the whole table
+            chunk_changed = _get_changed_rows(frame, _read_rows(conn, table, frame, keys), keys)
+            if len(chunk_changed):
+                _upsert_rows(conn, table, chunk_changed)
+            changed.append(chunk_changed)
+            count += len(frame)
+
+        changed = pd.concat(changed) if changed else pd.DataFrame()
+        record.rows_in = count
+        record.rows_out = len(changed)
+
+        elapsed = time.perf_counter() - start
+        print('Upserted {} changed of {} rows into {} in {:.2f}s'.format(len(changed), count, table.name, elapsed))
+
+    return changed
+
+
+def replace_frame(frame: pd.DataFrame, model: type, column: str, values: list):
+    table = model.__table__
+
+    Connection = get_connection()
+    with stage('replace ' + table.name, len(frame)), Connection() as conn, conn.begin():
+        start = time.perf_counter()
+        conn.execute(delete(table).where(table.c[column].in_(values)))
+        # surrogate ids of the replacement rows continue after the rows that are kept
+        last_id = conn.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar()
+        _write_frame(conn, table, frame.assign(id=frame['id'] + last_id))
+        _report(table, len(frame), time.perf_counter() - start)
+
+
+def load_view(statement: text):
+    Connection = get_connection()
+    with stage('load view'), Connection() as conn:
+        conn.execute(statement)
+        conn.commit()
+
+
+def _load_data_with_session(models: Generator[Any, None, None]):
     Session = get_session()
 
     with Session() as db_session:
@@ -14,9 +113,186 @@ def load_data(models: Generator[Any, None, None]):
         db_session.flush()
 
 
-def load_view(statement: text):
-    Connection = get_connection()
-    with Connection() as conn:
-        conn.execute(statement)
-        conn.commit()
+def _to_rows(model_class: type, models: Iterable[Any]) -> Iterator[dict]:
+    columns = [(attr.key, attr.columns[0].name, _get_coercer(attr.columns[0].type))
+               for attr in inspect(model_class).column_attrs]
+
+    for model in models:
+        row = {}
+        for key, name, coerce in columns:
+            value = getattr(model, key)
+            row[name] = None if value is None else coerce(value)
+
+        yield row
+
+
+def _get_coercer(column_type) -> Callable[[Any], Any]:
+    if isinstance(column_type, Enum):
+        return lambda value: value.name if isinstance(value, enum.Enum) else str(value)
+    if isinstance(column_type, Integer):
+        return int
+    if isinstance(column_type, Float):
+        return float
+
+    return str
+
+
+def _write_rows(conn: Connection, table: Table, rows: Iterator[dict]) -> int:
+    cursor = conn.connection.dbapi_connection.cursor()
+    use_copy = hasattr(cursor, 'copy_expert')
+    count = 0
+
+    while True:
+        batch = list(itertools.islice(rows, _BATCH_SIZE))
+        if not batch:
+            break
+
+        if use_copy:
+            _copy_batch(cursor, table, batch)
+        else:
+            conn.execute(insert(table), batch)
+
+        count += len(batch)
+
+    cursor.close()
+
+    return count
+
+
+def _write_frame(conn: Connection, table: Table, frame: pd.DataFrame):
+    if 'duckdb' == conn.dialect.name:
+        _insert_registered_frame(conn, table.name, frame)
+        return
+
+    cursor = conn.connection.dbapi_connection.cursor()
+
+    if hasattr(cursor, 'copy_expert'):
+        _copy_frame(cursor, table.name, frame)
+    else:
+        for chunk in _iterate_chunks(frame):
+            conn.execute(insert(table), _to_records(chunk))
+
+    cursor.close()
+
+
+def _copy_frame(cursor, table_name: str, frame: pd.DataFrame):
+    for chunk in _iterate_chunks(frame):
+        buffer = io.StringIO()
+        chunk.to_csv(buffer, header=False, index=False, na_rep=_COPY_NULL, lineterminator='\n')
+        buffer.seek(0)
+        _copy_from_buffer(cursor, table_name, list(chunk.columns), buffer)
+
+
+def _insert_registered_frame(conn: Connection, table_name: str, frame: pd.DataFrame):
+    # DuckDB scans the registered frame's columns directly, the columnar counterpart of COPY
+    dbapi_connection = conn.connection.dbapi_connection
+    view_name = '_frame_{}'.format(table_name)
+    columns = ', '.join(frame.columns)
+    dbapi_connection.register(view_name, frame)
+    try:
+        with database_call():
+            dbapi_connection.execute('INSERT INTO {} ({}) SELECT {} FROM {}'.format(
+                table_name, columns, columns, view_name
+            ))
+    finally:
+        dbapi_connection.unregister(view_name)
+
+
+def _iterate_chunks(frame: pd.DataFrame) -> Iterator[pd.DataFrame]:
+    for offset in range(0, len(frame), _BATCH_SIZE):
+        yield frame.iloc[offset:offset + _BATCH_SIZE]
+
+
+def _to_records(frame: pd.DataFrame) -> list[dict]:
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+
+def _get_primary_key(table: Table) -> list[str]:
+    return [column.name for column in table.primary_key.columns]
+
+
+def _read_rows(conn: Connection, table: Table, frame: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    if frame.empty:
+        return frame.iloc[0:0]
+
+    lowest, highest = frame[keys[0]].agg(['min', 'max']).tolist()
+    # enum columns are compared by label, the same way frames store them
+    result = conn.execute(select(*[
+        table.c[column].cast(String).label(column) if isinstance(table.c[column].type, Enum) else table.c[column]
+        for column in frame.columns
+    ]).where(table.c[keys[0]].between(lowest, highest)))
+    current = pd.DataFrame(result.fetchall(), columns=list(frame.columns))
+
+    return current.astype(frame.dtypes.to_dict())
+
+
+def _get_changed_rows(frame: pd.DataFrame, current: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    if current.empty:
+        return frame
+
+    frame_hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    current_hashes = pd.util.hash_pandas_object(current, index=False).to_numpy()
+    positions = pd.MultiIndex.from_frame(current[keys]).get_indexer(pd.MultiIndex.from_frame(frame[keys]))
+
+    changed = (positions == -1) | (current_hashes[positions] != frame_hashes)
+
+    return frame[changed]
+
+
+def _upsert_rows(conn: Connection, table: Table, frame: pd.DataFrame):
+    keys = _get_primary_key(table)
+    columns = list(frame.columns)
+    cursor = conn.connection.dbapi_connection.cursor()
+
+    if hasattr(cursor, 'copy_expert'):
+        staging_table = '_staging_{}'.format(table.name)
+        conn.exec_driver_sql('CREATE TEMPORARY TABLE {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP'.format(
+            staging_table, table.name
+        ))
+        _copy_frame(cursor, staging_table, frame)
+        conn.exec_driver_sql(
+            'INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} '
+            'ON CONFLICT ({keys}) DO UPDATE SET {updates}'.format(
+                table=table.name,
+                columns=', '.join(columns),
+                staging=staging_table,
+                keys=', '.join(keys),
+                updates=', '.join('{0} = EXCLUDED.{0}'.format(column) for column in columns if column not in keys)
+            )
+        )
+        conn.exec_driver_sql('DROP TABLE {}'.format(staging_table))
+    else:
+        statement = (sqlite if 'sqlite' == conn.dialect.name else postgresql).insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=keys,
+            set_={column: statement.excluded[column] for column in columns if column not in keys}
+        )
+        for chunk in _iterate_chunks(frame):
+            conn.execute(statement, _to_records(chunk))
+
+    cursor.close()
+
+
+def _copy_batch(cursor, table: Table, batch: list[dict]):
+    columns = list(batch[0].keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    for row in batch:
+        writer.writerow([_COPY_NULL if row[column] is None else row[column] for column in columns])
+
+    buffer.seek(0)
+    _copy_from_buffer(cursor, table.name, columns, buffer)
+
+
+def _copy_from_buffer(cursor, table_name: str, columns: list[str], buffer: io.StringIO):
+    statement = "COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL '{}')".format(
+        table_name, ', '.join(columns), _COPY_NULL
+    )
+    # COPY goes straight to the DBAPI cursor and bypasses the engine events that time other statements
+    with database_call():
+        cursor.copy_expert(statement, buffer)
+
 
+def _report(table: Table, count: int, elapsed: float):
+    rate = count / elapsed if elapsed > 0 else float(count)
+    print('Loaded {} rows into {} in {:.2f}s ({:.0f} rows/s)'.format(count, table.name, elapsed, rate))
@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Optional
+from tabulate import tabulate
+from f1predictions.etl.instrumentation import StageRecord, get_records, get_record_count, add_records
+from f1predictions.etl.transformer import Transformer
+from f1predictions.orm.config.database import dispose_engine_after_fork
+
+
+class LoadStep:
+    def __init__(self, description: str, model: type, factory: Callable[[], Transformer], reads: tuple = ()):
+        self.description = description
+        self.model = model
+        self.factory = factory
+        # tables the transformer reads while building its data that are not foreign keys of the target table
+        self.reads = reads
+
+    @property
+    def table(self) -> str:
+        return self.model.__table__.name
+
+
+class StepTiming:
+    def __init__(self, step: LoadStep, start: float, end: float, worker: str, records: list[StageRecord] = None):
+        self.step = step
+        self.start = start
+        self.end = end
+        self.worker = worker
+        self.records = records or []
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def get_dependencies(steps: list[LoadStep]) -> dict[str, set[str]]:
+    tables = {step.table for step in steps}
+    dependencies = {}
+    for step in steps:
+        referred = {foreign_key.column.table.name for foreign_key in step.model.__table__.foreign_keys}
+        dependencies[step.table] = (referred | set(step.reads)) & tables - {step.table}
+
+    return dependencies
+
+
+def run_steps(steps: list[LoadStep], run: Callable[[LoadStep], None], max_parallelism: int = 4,
+              use_processes: bool = False, on_start: Optional[Callable[[LoadStep], None]] = None,
+              on_finish: Optional[Callable[[StepTiming], None]] = None) -> list[StepTiming]:
+    # the callbacks run on the calling thread, so progress output of concurrent steps does not interleave
+    dependencies = get_dependencies(steps)
+    pending = {step.table: step for step in steps}
+    completed = set()
+    timings = []
+    origin = time.perf_counter()
+
+    with _create_executor(max_parallelism, use_processes) as executor:
+        running = {}
+        while pending or running:
+            for table in [table for table in pending if dependencies[table] <= completed]:
+                step = pending.pop(table)
+                if on_start is not None:
+                    on_start(step)
+                running[executor.submit(_execute_step, run, step, origin, use_processes)] = table
+
+            if not running:
+                raise ValueError('Circular dependency between tables: {}'.format(', '.join(sorted(pending))))
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                table = running.pop(future)
+                try:
+                    timing = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+                timings.append(timing)
+                add_records(timing.records)
+                completed.add(table)
+                if on_finish is not None:
+                    on_finish(timing)
+
+    return timings
+
+
+def _create_executor(max_parallelism: int, use_processes: bool):
+    if use_processes:
+        # forked workers inherit the parent's pooled connections, which must not be shared
+        return ProcessPoolExecutor(
+            max_workers=max_parallelism,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=dispose_engine_after_fork
+        )
+
+    return ThreadPoolExecutor(max_workers=max_parallelism, thread_name_prefix='load')
+
+
+def _execute_step(run: Callable[[LoadStep], None], step: LoadStep, origin: float,
+                  in_process: bool = False) -> StepTiming:
+    first_record = get_record_count()
+    start = time.perf_counter() - origin
+    run(step)
+    worker = '{}/{}'.format(os.getpid(), threading.current_thread().name)
+    # stage records of a worker process would otherwise never reach the parent
+    records = get_records(first_record) if in_process else []
+
+    return StepTiming(step, start, time.perf_counter() - origin, worker, records)
+
+
+def format_timings(timings: list[StepTiming]) -> str:
+    rows = [
+        [timing.step.description, timing.step.table, timing.start, timing.end, timing.duration, timing.worker]
+        for timing in sorted(timings, key=lambda timing: timing.start)
+    ]
+    wall_time = max((timing.end for timing in timings), default=0.0)
+    rows.append(['total (wall clock)', '', 0.0, wall_time, wall_time, ''])
+
+    return tabulate(rows, headers=['step', 'table', 'start', 'end', 'duration', 'worker'], floatfmt='.2f')
@@ -1,7 +1,8 @@
 from abc import abstractmethod, ABC
-from typing import Generator
+from typing import Generator, Iterator, Optional
+import numpy as np
 from f1predictions.orm.config.database import get_session, get_connection
-from sqlalchemy import select, text
+from sqlalchemy import select, text, bindparam, TextClause
 import pandas as pd
 from f1predictions.etl.extractor import Extractor, DirectDataFrameExtractor
 from f1predictions.orm.entity import Driver, Constructor, Status, Circuit, Race, Round, DriverConstructor, \
@@ -9,11 +10,19 @@ from f1predictions.orm.entity import Driver, Constructor, Status, Circuit, Race,
     RaceConstructorResult, RaceDriverStandings, RaceConstructorStandings, LapTimes, QualifyingResult, DriverRating, \
     DriverCategory
 from f1predictions.orm.enums import DriverCategoryEnum
-from f1predictions.utils import convert_time_to_ms, create_drivers_constructors_dataframe, find_driver_constructor_id, \
-    create_rounds_dataframe
+from f1predictions.utils import convert_time_to_ms, create_drivers_constructors_dataframe, create_rounds_dataframe, \
+    convert_times_to_ms, DriverConstructorLookup
+
+_RESULT_KEYS_DTYPES = {
+    'raceId': 'int64',
+    'driverId': 'int64',
+    'constructorId': 'int64',
+}
 
 
 class Transformer(ABC):
+    model: type
+
     def __init__(self, extractor: Extractor):
         self.extractor = extractor
 
@@ -21,6 +30,16 @@ class Transformer(ABC):
     def transform_to_model(self) -> Generator:
         pass
 
+    @abstractmethod
+    def transform_to_frame(self) -> pd.DataFrame:
+        pass
+
+    def transform_to_frames(self, chunksize: int) -> Iterator[pd.DataFrame]:
+        yield self.transform_to_frame()
+
+    def _to_table_frame(self, columns: dict) -> pd.DataFrame:
+        return pd.DataFrame(columns)[[column.name for column in self.model.__table__.columns]]
+
 
 class RelatedModelsTransformer(Transformer, ABC):
     def __init__(self, extractor: Extractor, related_model_data: dict[str, pd.DataFrame]):
@@ -29,6 +48,8 @@ class RelatedModelsTransformer(Transformer, ABC):
 
 
 class DriversTransformer(Transformer):
+    model = Driver
+
     def transform_to_model(self) -> Generator[Driver, None, None]:
         df = self.extractor.extract()
         for i in range(len(df)):
@@ -39,14 +60,29 @@ class DriversTransformer(Transformer):
 
             yield driver
 
+    def transform_to_frame(self) -> pd.DataFrame:
+        df = self.extractor.extract()
+
+        return self._to_table_frame({
+            'id': df['driverId'].astype('int64'),
+            'name': df['forename'].astype(str),
+            'surname': df['surname'].astype(str),
+        })
+
 
 def get_drivers_transformer() -> DriversTransformer:
-    extractor = Extractor('drivers.csv', ['driverId', 'forename', 'surname'])
+    extractor = Extractor('drivers.csv', ['driverId', 'forename', 'surname'], {
+        'driverId': 'int64',
+        'forename': str,
+        'surname': str,
+    })
 
     return DriversTransformer(extractor)
 
 
 class ConstructorsTransformer(Transformer):
+    model = Constructor
+
     def transform_to_model(self) -> Generator[Constructor, None, None]:
         df = self.extractor.extract()
         for i in range(len(df)):
@@ -56,14 +92,24 @@ class ConstructorsTransformer(Transformer):
 
             yield constructor
 
+    def transform_to_frame(self) -> pd.DataFrame:
+        df = self.extractor.extract()
+
+        return self._to_table_frame({
+            'id': df['constructorId'].astype('int64'),
+            'name': df['name'].astype(str),
+        })
+
 
 def get_constructors_transformer() -> ConstructorsTransformer:
-    extractor = Extractor('constructors.csv', ['constructorId', 'name'])
+    extractor = Extractor('constructors.csv', ['constructorId', 'name'], {'constructorId': 'int64', 'name': str})
 
     return ConstructorsTransformer(extractor)
 
 
 class StatusesTransformer(Transformer):
+    model = Status
+
     def transform_to_model(self) -> Generator[Status, None, None]:
         df = self.extractor.extract()
         for i in range(len(df)):
@@ -73,14 +119,24 @@ class StatusesTransformer(Transformer):
 
             yield status
 
+    def transform_to_frame(self) -> pd.DataFrame:
+        df = self.extractor.extract()
+
+        return self._to_table_frame({
+            'id': df['statusId'].astype('int64'),
+            'status': df['status'].astype(str),
+        })
+
 
 def get_statuses_transformer() -> StatusesTransformer:
-    extractor = Extractor('status.csv', ['statusId', 'status'])
+    extractor = Extractor('status.csv', ['statusId', 'status'], {'statusId': 'int64', 'status': str})
 
     return StatusesTransformer(extractor)
 
 
 class CircuitsTransformer(Transformer):
+    model = Circuit
+
     def transform_to_model(self) -> Generator[Circuit, None, None]:
         df = self.extractor.extract()
         for i in range(len(df)):
@@ -90,14 +146,24 @@ class CircuitsTransformer(Transformer):
 
             yield circuit
 
+    def transform_to_frame(self) -> pd.DataFrame:
+        df = self.extractor.extract()
+
+        return self._to_table_frame({
+            'id': df['circuitId'].astype('int64'),
+            'name': df['name'].astype(str),
+        })
+
 
 def get_circuits_transformer() -> CircuitsTransformer:
-    extractor = Extractor('circuits.csv', ['circuitId', 'name'])
+    extractor = Extractor('circuits.csv', ['circuitId', 'name'], {'circuitId': 'int64', 'name': str})
 
     return CircuitsTransformer(extractor)
 
 
 class RacesTransformer(Transformer):
+    model = Race
+
     def transform_to_model(self) -> Generator[Race, None, None]:
         df = self.extractor.extract().drop_duplicates(['name']).reset_index()
         for i in range(len(df)):
@@ -108,14 +174,25 @@ class RacesTransformer(Transformer):
 
             yield race
 
+    def transform_to_frame(self) -> pd.DataFrame:
+        df = self.extractor.extract().drop_duplicates(['name']).reset_index(drop=True)
+
+        return self._to_table_frame({
+            'id': np.arange(1, len(df) + 1, dtype='int64'),
+            'name': df['name'].astype(str),
+            'circuit_id': df['circuitId'].astype('int64'),
+        })
+
 
 def get_races_transformer() -> RacesTransformer:
-    extractor = Extractor('races.csv', ['name', 'circuitId'])
+    extractor = Extractor('races.csv', ['name', 'circuitId'], {'name': str, 'circuitId': 'int64'})
 
     return RacesTransformer(extractor)
 
 
 class RoundsTransformer(RelatedModelsTransformer):
+    model = Round
+
     def transform_to_model(self) -> Generator[Round, None, None]:
         df = self.extractor.extract().drop_duplicates().reset_index()
         races_df = self.related_model_data['races']
@@ -129,10 +206,26 @@ class RoundsTransformer(RelatedModelsTransformer):
             round_entity.year = int(df.loc[i, 'year'])
             yield round_entity
 
+    def transform_to_frame(self) -> pd.DataFrame:
+        df = self.extractor.extract().drop_duplicates().reset_index(drop=True)
+        races_df = self.related_model_data['races'].drop_duplicates(['name'])
+
+        return self._to_table_frame({
+            'id': df['raceId'].astype('int64'),
+            'year': df['year'].astype('int64'),
+            'round_number': df['round'].astype('int64'),
+            'race_id': df['name'].astype(str).map(races_df.set_index('name')['id']).astype('int64'),
+        })
+
 
 def get_rounds_transformer() -> RoundsTransformer:
     Session = get_session()
-    extractor = Extractor('races.csv', ['raceId', 'name', 'round', 'year'])
+    extractor = Extractor('races.csv', ['raceId', 'name', 'round', 'year'], {
+        'raceId': 'int64',
+        'name': str,
+        'round': 'int64',
+        'year': 'int64',
+    })
     with Session() as session:
         races = session.scalars(select(Race))
         data = [(i.id, i.name) for i in races]
@@ -142,11 +235,10 @@ def get_rounds_transformer() -> RoundsTransformer:
 
 
 class DriversConstructorsTransformer(RelatedModelsTransformer):
+    model = DriverConstructor
+
     def transform_to_model(self) -> Generator[DriverConstructor, None, None]:
-        df = self.extractor.extract()
-        rounds_df = self.related_model_data['rounds']
-        df = df.join(rounds_df.set_index('raceId'), on='raceId').dropna().drop_duplicates(
-            ['driverId', 'constructorId', 'year'])[['driverId', 'constructorId', 'year']]
+        df = self._extract_drivers_constructors()
         identifier = 1
         for value in df.values:
             driver_constructor = DriverConstructor()
@@ -158,9 +250,26 @@ class DriversConstructorsTransformer(RelatedModelsTransformer):
 
             yield driver_constructor
 
+    def transform_to_frame(self) -> pd.DataFrame:
+        df = self._extract_drivers_constructors().reset_index(drop=True)
+
+        return self._to_table_frame({
+            'id': np.arange(1, len(df) + 1, dtype='int64'),
+            'year': df['year'].astype('int64'),
+            'driver_id': df['driverId'].astype('int64'),
+            'constructor_id': df['constructorId'].astype('int64'),
+        })
+
+    def _extract_drivers_constructors(self) -> pd.DataFrame:
+        df = self.extractor.extract()
+        rounds_df = self.related_model_data['rounds']
+
+        return df.join(rounds_df.set_index('raceId'), on='raceId').dropna().drop_duplicates(
+            ['driverId', 'constructorId', 'year'])[['driverId', 'constructorId', 'year']]
+
 
 def get_drivers_constructors_transformer() -> DriversConstructorsTransformer:
-    extractor = Extractor('results.csv', ['driverId', 'constructorId', 'raceId'])
+    extractor = Extractor('results.csv', ['driverId', 'constructorId', 'raceId'], _RESULT_KEYS_DTYPES)
 
     Session = get_session()
     with Session() as session:
@@ -172,20 +281,16 @@ def get_drivers_constructors_transformer() -> DriversConstructorsTransformer:
 
 
 class RaceDriversResultsTransformer(RelatedModelsTransformer):
+    model = RaceDriverResult
+
     def transform_to_model(self) -> Generator[RaceDriverResult, None, None]:
         df = self.extractor.extract()
+        driver_constructor_ids = _get_driver_constructor_ids(df, self.related_model_data)
         for i in range(len(df)):
             race_driver_result = RaceDriverResult()
-            race = self.related_model_data['rounds'] \
-                .where(self.related_model_data['rounds']['id'] == df.loc[i, 'raceId'])['year'].dropna()
-            driver_constructor = find_driver_constructor_id(
-                self.related_model_data['drivers_constructors'],
-                int(df.loc[i, 'driverId']),
-                int(df.loc[i, 'constructorId']),
-                int(race.iloc[0])
-            )
+            driver_constructor = int(driver_constructor_ids[i])
 
-            fastest_lap_time = convert_time_to_ms(str(df.loc[i, 'fastestLapTime']))
+            fastest_lap_time = convert_time_to_ms(df.loc[i, 'fastestLapTime'])
 
             race_driver_result.id = int(df.loc[i, 'resultId'])
             race_driver_result.driver_constructor_id = driver_constructor
@@ -193,18 +298,38 @@ class RaceDriversResultsTransformer(RelatedModelsTransformer):
             race_driver_result.fastest_lap_time = fastest_lap_time
             race_driver_result.round_id = int(df.loc[i, 'raceId'])
             race_driver_result.status_id = int(df.loc[i, 'statusId'])
-            if "\\N" == df.loc[i, 'position']:
+            if pd.isnull(df.loc[i, 'position']):
                 race_driver_result.position = 0
             else:
                 race_driver_result.position = int(df.loc[i, 'position'])
 
-            if "\\N" == df.loc[i, 'fastestLapSpeed']:
+            if pd.isnull(df.loc[i, 'fastestLapSpeed']):
                 race_driver_result.fastest_lap_speed = 0.0
             else:
                 race_driver_result.fastest_lap_speed = float(df.loc[i, 'fastestLapSpeed'])
 
             yield race_driver_result
 
+    def transform_to_frame(self) -> pd.DataFrame:
+        df = self.extractor.extract()
+
+        return self._to_table_frame({
+            'id': df['resultId'].astype('int64'),
+            'points': df['points'].astype('float64'),
+            'position': df['position'].fillna(0).astype('int64'),
+            'fastest_lap_time': convert_times_to_ms(df['fastestLapTime']),
+            'fastest_lap_speed': df['fastestLapSpeed'].fillna(0.0).astype('float64'),
+            'driver_constructor_id': _get_driver_constructor_ids(df, self.related_model_data),
+            'round_id': df['raceId'].astype('int64'),
+            'status_id': df['statusId'].astype('int64'),
+        })
+
+
+def _get_driver_constructor_ids(df: pd.DataFrame, related_model_data: dict[str, pd.DataFrame]) -> np.ndarray:
+    lookup = DriverConstructorLookup(related_model_data['drivers_constructors'], related_model_data['rounds'])
+
+    return lookup.get_driver_constructor_ids(df['raceId'], df['driverId'], df['constructorId'])
+
 
 def get_race_drivers_results_transformer():
     extractor = Extractor('results.csv', [
@@ -217,7 +342,15 @@ def get_race_drivers_results_transformer():
         'fastestLapSpeed',
         'position',
         'statusId'
-    ])
+    ], {
+        **_RESULT_KEYS_DTYPES,
+        'resultId': 'int64',
+        'points': 'float64',
+        'fastestLapTime': str,
+        'fastestLapSpeed': 'float64',
+        'position': 'Int64',
+        'statusId': 'int64',
+    })
 
     return RaceDriversResultsTransformer(extractor, {
         'drivers_constructors': create_drivers_constructors_dataframe(),
@@ -226,6 +359,8 @@ def get_race_drivers_results_transformer():
 
 
 class RaceConstructorsResultsTransformer(Transformer):
+    model = RaceConstructorResult
+
     def transform_to_model(self) -> Generator[RaceConstructorResult, None, None]:
         df = self.extractor.extract()
         for i in range(len(df)):
@@ -237,6 +372,16 @@ class RaceConstructorsResultsTransformer(Transformer):
 
             yield race_constructor_result
 
+    def transform_to_frame(self) -> pd.DataFrame:
+        df = self.extractor.extract()
+
+        return self._to_table_frame({
+            'id': df['constructorResultsId'].astype('int64'),
+            'points': df['points'].astype('float64'),
+            'constructor_id': df['constructorId'].astype('int64'),
+            'round_id': df['raceId'].astype('int64'),
+        })
+
 
 def get_race_constructors_results_transformer():
     extractor = Extractor('constructor_results.csv', [
@@ -244,24 +389,25 @@ def get_race_constructors_results_transformer():
         'raceId',
         'constructorId',
         'points',
-    ])
+    ], {
+        'constructorResultsId': 'int64',
+        'raceId': 'int64',
+        'constructorId': 'int64',
+        'points': 'float64',
+    })
 
     return RaceConstructorsResultsTransformer(extractor)
 
 
 class QualifyingResultsTransformer(RelatedModelsTransformer):
+    model = QualifyingResult
+
     def transform_to_model(self) -> Generator[QualifyingResult, None, None]:
         df = self.extractor.extract()
+        driver_constructor_ids = _get_driver_constructor_ids(df, self.related_model_data)
         for i in range(len(df)):
-            race = self.related_model_data['rounds'].where(
-                self.related_model_data['rounds']['id'] == int(df.loc[i, 'raceId']))['year'].dropna()
             qualifying_result = QualifyingResult()
-            driver_constructor = find_driver_constructor_id(
-                self.related_model_data['drivers_constructors'],
-                int(df.loc[i, 'driverId']),
-                int(df.loc[i, 'constructorId']),
-                int(race.iloc[0])
-            )
+            driver_constructor = int(driver_constructor_ids[i])
 
             qualifying_result.id = int(df.loc[i, 'qualifyId'])
             qualifying_result.round_id = int(df.loc[i, 'raceId'])
@@ -273,6 +419,19 @@ class QualifyingResultsTransformer(RelatedModelsTransformer):
 
             yield qualifying_result
 
+    def transform_to_frame(self) -> pd.DataFrame:
+        df = self.extractor.extract()
+
+        return self._to_table_frame({
+            'id': df['qualifyId'].astype('int64'),
+            'position': df['position'].astype('int64'),
+            'q1': convert_times_to_ms(df['q1']),
+            'q2': convert_times_to_ms(df['q2']),
+            'q3': convert_times_to_ms(df['q3']),
+            'round_id': df['raceId'].astype('int64'),
+            'driver_constructor_id': _get_driver_constructor_ids(df, self.related_model_data),
+        })
+
 
 def get_qualifying_results_transformer():
     extractor = Extractor('qualifying.csv', [
@@ -284,7 +443,14 @@ def get_qualifying_results_transformer():
         'q2',
         'q3',
         'position'
-    ])
+    ], {
+        **_RESULT_KEYS_DTYPES,
+        'qualifyId': 'int64',
+        'q1': str,
+        'q2': str,
+        'q3': str,
+        'position': 'int64',
+    })
 
     return QualifyingResultsTransformer(extractor, {
         'drivers_constructors': create_drivers_constructors_dataframe(),
@@ -293,8 +459,11 @@ def get_qualifying_results_transformer():
 
 
 class LapTimesTransformer(RelatedModelsTransformer):
+    model = LapTimes
+
     def transform_to_model(self):
-        df = self.extractor.extract()
+        df = self._extract_lap_times()
+        driver_constructor_ids = _get_driver_constructor_ids(df, self.related_model_data)
         for i in range(len(df)):
             lap_time = LapTimes()
             lap_time.id = i + 1
@@ -302,21 +471,61 @@ class LapTimesTransformer(RelatedModelsTransformer):
             lap_time.position = int(df.loc[i, 'position'])
             lap_time.time = int(df.loc[i, 'milliseconds'])
             lap_time.round_id = int(df.loc[i, 'raceId'])
-            lap_time.driver_constructor_id = int(df.loc[i, 'raceId'])
+            lap_time.driver_constructor_id = int(driver_constructor_ids[i])
 
             yield lap_time
 
+    def transform_to_frame(self) -> pd.DataFrame:
+        return self._to_lap_times_frame(self._extract_lap_times(), 1, self._get_lookup())
+
+    def transform_to_frames(self, chunksize: int) -> Iterator[pd.DataFrame]:
+        lookup = self._get_lookup()
+        race_constructors = self._get_race_constructors()
+        first_id = 1
+        for chunk in self.extractor.extract_chunks(chunksize):
+            df = chunk.merge(race_constructors, on=['raceId', 'driverId'], how='left')
+            yield self._to_lap_times_frame(df, first_id, lookup)
+            first_id += len(df)
+
+    def _to_lap_times_frame(self, df: pd.DataFrame, first_id: int, lookup: DriverConstructorLookup) -> pd.DataFrame:
+        return self._to_table_frame({
+            'id': np.arange(first_id, first_id + len(df), dtype='int64'),
+            'lap': df['lap'].astype('int64'),
+            'position': df['position'].astype('int64'),
+            'time': df['milliseconds'].astype('int64'),
+            'driver_constructor_id': lookup.get_driver_constructor_ids(df['raceId'], df['driverId'], df['constructorId']),
+            'round_id': df['raceId'].astype('int64'),
+        })
+
+    def _get_lookup(self) -> DriverConstructorLookup:
+        return DriverConstructorLookup(self.related_model_data['drivers_constructors'], self.related_model_data['rounds'])
+
+    def _get_race_constructors(self) -> pd.DataFrame:
+        return self.related_model_data['results'].drop_duplicates(['raceId', 'driverId'])
+
+    def _extract_lap_times(self) -> pd.DataFrame:
+        return self.extractor.extract().merge(self._get_race_constructors(), on=['raceId', 'driverId'], how='left')
+
 
 def get_lap_times_transformer():
-    extractor = Extractor('lap_times.csv', ['raceId', 'driverId', 'lap', 'position', 'milliseconds'])
+    extractor = Extractor('lap_times.csv', ['raceId', 'driverId', 'lap', 'position', 'milliseconds'], {
+        'raceId': 'int64',
+        'driverId': 'int64',
+        'lap': 'int64',
+        'position': 'int64',
+        'milliseconds': 'int64',
+    })
 
     return LapTimesTransformer(extractor, {
         'drivers_constructors': create_drivers_constructors_dataframe(),
-        'rounds': create_rounds_dataframe()
+        'rounds': create_rounds_dataframe(),
+        'results': Extractor('results.csv', ['raceId', 'driverId', 'constructorId'], _RESULT_KEYS_DTYPES).extract()
     })
 
 
 class DriversStandingsTransformer(Transformer):
+    model = RaceDriverStandings
+
     def transform_to_model(self) -> Generator[RaceDriverStandings, None, None]:
         df = self.extractor.extract()
         index = 1
@@ -332,56 +541,59 @@ class DriversStandingsTransformer(Transformer):
 
             yield race_driver_standings
 
+    def transform_to_frame(self) -> pd.DataFrame:
+        df = self.extractor.extract().reset_index(drop=True)
+
+        return self._to_table_frame({
+            'id': np.arange(1, len(df) + 1, dtype='int64'),
+            'year': df['year'].astype('int64'),
+            'points': df['sum_points'].astype('float64'),
+            'position': df['wdc_position'].astype('int64'),
+            'wins': df['wins'].astype('int64'),
+            'driver_constructor_id': df['driver_constructor_id'].astype('int64'),
+        })
 
-def get_drivers_standings_transformer() -> DriversStandingsTransformer:
+
+def get_drivers_standings_transformer(years: Optional[list[int]] = None) -> DriversStandingsTransformer:
     standings_statement = """
     SELECT
-        rr.year AS year,
         dc.id AS driver_constructor_id,
-        SUM(dr.points) as sum_points,
-        ROW_NUMBER() OVER (ORDER BY SUM(dr.points) DESC) AS wdc_position
+        rr.year AS year,
+        SUM(dr.points) AS sum_points,
+        ROW_NUMBER() OVER (PARTITION BY rr.year ORDER BY SUM(dr.points) DESC, dc.id) AS wdc_position,
+        COUNT(*) FILTER (WHERE dr.position = 1) AS wins
     FROM race_driver_result dr
     JOIN driver_constructor dc ON dc.id = dr.driver_constructor_id
     JOIN round rr ON dr.round_id = rr.id
-    WHERE rr.year = {}
+    WHERE {}
     GROUP BY rr.year, dc.id
+    ORDER BY rr.year, wdc_position
     """
 
-    wins_statement = """
-    SELECT
-        dc.id AS driver_constructor_id,
-        r.year AS year,
-        COUNT(dr2.id) AS wins
-    FROM race_driver_result dr
-    LEFT JOIN race_driver_result dr2 ON dr2.id = dr.id AND dr2.position = 1
-    JOIN round r ON r.id = dr.round_id
-    JOIN driver_constructor dc ON dc.id = dr.driver_constructor_id
-    WHERE r.year = {}
-    GROUP BY dc.id, r.year
-    """
+    standings = _fetch_dataframe(_filter_years(standings_statement, years), {'years': years})
 
-    Connection = get_connection()
+    return DriversStandingsTransformer(DirectDataFrameExtractor(standings))
 
-    full_standings = []
-    for year in range(1950, 2024):
-        standings_query = text(standings_statement.format(year))
-        wins_query = text(wins_statement.format(year))
 
-        with Connection() as conn:
-            standings, wins = conn.execute(standings_query), conn.execute(wins_query)
+def _filter_years(statement: str, years: Optional[list[int]]) -> TextClause:
+    # an expanding IN list instead of a bound array, which only PostgreSQL understands
+    if years is None:
+        return text(statement.format('1 = 1'))
 
-        standings_df = pd.DataFrame(standings.fetchall())
-        wins_df = pd.DataFrame(wins.fetchall())
-        standings_df.keys = standings.columns
-        wins_df.keys = wins.columns
+    return text(statement.format('rr.year IN :years')).bindparams(bindparam('years', expanding=True))
 
-        full_standings.append(pd.merge(standings_df, wins_df, on=['driver_constructor_id', 'year']).dropna()
-                              [['driver_constructor_id', 'year', 'sum_points', 'wdc_position', 'wins']])
 
-    return DriversStandingsTransformer(DirectDataFrameExtractor(pd.concat([i for i in full_standings])))
+def _fetch_dataframe(statement: TextClause, parameters: dict) -> pd.DataFrame:
+    Connection = get_connection()
+    with Connection() as conn:
+        result = conn.execute(statement, parameters)
+
+        return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
 
 
 class ConstructorsStandingsTransformer(Transformer):
+    model = RaceConstructorStandings
+
     def transform_to_model(self) -> Generator[RaceConstructorStandings, None, None]:
         df = self.extractor.extract().reset_index()
         index = 1
@@ -397,55 +609,43 @@ class ConstructorsStandingsTransformer(Transformer):
 
             yield race_constructor_standings
 
+    def transform_to_frame(self) -> pd.DataFrame:
+        df = self.extractor.extract().reset_index(drop=True)
+
+        return self._to_table_frame({
+            'id': np.arange(1, len(df) + 1, dtype='int64'),
+            'year': df['year'].astype('int64'),
+            'points': df['sum_points'].astype('float64'),
+            'position': df['wcc_position'].astype('int64'),
+            'wins': df['wins'].astype('int64'),
+            'constructor_id': df['constructor_id'].astype('int64'),
+        })
 
-def get_constructors_standings_transformer():
+
+def get_constructors_standings_transformer(years: Optional[list[int]] = None) -> ConstructorsStandingsTransformer:
     standings_statement = """
     SELECT
-        rr.year AS year,
         dc.constructor_id AS constructor_id,
-        SUM(dr.points) as sum_points,
-        ROW_NUMBER() OVER (ORDER BY SUM(dr.points) DESC) AS wcc_position
+        rr.year AS year,
+        SUM(dr.points) AS sum_points,
+        ROW_NUMBER() OVER (PARTITION BY rr.year ORDER BY SUM(dr.points) DESC, dc.constructor_id) AS wcc_position,
+        COUNT(*) FILTER (WHERE dr.position = 1) AS wins
     FROM race_driver_result dr
     JOIN driver_constructor dc ON dc.id = dr.driver_constructor_id
     JOIN round rr ON dr.round_id = rr.id
-    WHERE rr.year = {}
+    WHERE {}
     GROUP BY rr.year, dc.constructor_id
+    ORDER BY rr.year, wcc_position
     """
 
-    wins_statement = """
-    SELECT
-        dc.constructor_id AS constructor_id,
-        r.year AS year,
-        COUNT(dr2.id) AS wins
-    FROM race_driver_result dr
-    LEFT JOIN race_driver_result dr2 ON dr2.id = dr.id AND dr2.position = 1
-    JOIN round r ON r.id = dr.round_id
-    JOIN driver_constructor dc ON dc.id = dr.driver_constructor_id
-    WHERE r.year = {}
-    GROUP BY dc.constructor_id, r.year
-    """
-
-    Connection = get_connection()
-    full_standings = []
-    for year in range(1950, 2024):
-        standings_query = text(standings_statement.format(year))
-        wins_query = text(wins_statement.format(year))
+    standings = _fetch_dataframe(_filter_years(standings_statement, years), {'years': years})
 
-        with Connection() as conn:
-            standings, wins = conn.execute(standings_query), conn.execute(wins_query)
-
-        standings_df = pd.DataFrame(standings.fetchall())
-        wins_df = pd.DataFrame(wins.fetchall())
-        standings_df.keys = standings.columns
-        wins_df.keys = wins.columns
-
-        full_standings.append(pd.merge(standings_df, wins_df, on=['constructor_id', 'year']).dropna()
-                              [['constructor_id', 'year', 'sum_points', 'wcc_position', 'wins']])
-
-    return ConstructorsStandingsTransformer(DirectDataFrameExtractor(pd.concat([i for i in full_standings])))
+    return ConstructorsStandingsTransformer(DirectDataFrameExtractor(standings))
 
 
 class DriversRatingsTransformer(Transformer):
+    model = DriverRating
+
     def transform_to_model(self) -> Generator[DriverRating, None, None]:
         df = self.extractor.extract()
         for i in range(len(df)):
@@ -457,14 +657,30 @@ class DriversRatingsTransformer(Transformer):
 
             yield rating
 
+    def transform_to_frame(self) -> pd.DataFrame:
+        df = self.extractor.extract()
+
+        return self._to_table_frame({
+            'id': np.arange(1, len(df) + 1, dtype='int64'),
+            'rating': df['rank'].astype('float64'),
+            'year': df['year'].astype('int64'),
+            'driver_id': df['driverId'].astype('int64'),
+        })
+
 
 def get_drivers_ratings_transformer() -> DriversRatingsTransformer:
-    extractor = Extractor('power_rankings.csv', ['driverId', 'year', 'rank'])
+    extractor = Extractor('power_rankings.csv', ['driverId', 'year', 'rank'], {
+        'driverId': 'int64',
+        'year': 'int64',
+        'rank': 'float64',
+    })
 
     return DriversRatingsTransformer(extractor)
 
 
 class DriversCategoriesTransformer(Transformer):
+    model = DriverCategory
+
     def transform_to_model(self) -> Generator[DriverCategory, None, None]:
         df = self.extractor.extract()
         for i in range(len(df)):
@@ -476,8 +692,22 @@ class DriversCategoriesTransformer(Transformer):
 
             yield category
 
+    def transform_to_frame(self) -> pd.DataFrame:
+        df = self.extractor.extract()
+
+        return self._to_table_frame({
+            'id': np.arange(1, len(df) + 1, dtype='int64'),
+            'category': df['category'].astype('int64').map({category.value: category.name for category in DriverCategoryEnum}),
+            'year': df['year'].astype('int64'),
+            'driver_id': df['driverId'].astype('int64'),
+        })
+
 
 def get_drivers_categories_transformer() -> DriversCategoriesTransformer:
-    extractor = Extractor('driver_categories.csv', ['driverId', 'year', 'category'])
+    extractor = Extractor('driver_categories.csv', ['driverId', 'year', 'category'], {
+        'driverId': 'int64',
+        'year': 'int64',
+        'category': 'int64',
+    })
 
     return DriversCategoriesTransformer(extractor)
@@ -0,0 +1,70 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text
+import f1predictions.etl.view_definitions as viewdef
+from f1predictions.etl.instrumentation import stage
+from f1predictions.orm.config.database import get_connection, get_view_kind, is_embedded
+
+
+def create_views() -> dict[str, float]:
+    durations = {}
+    for name, statement in _get_create_statements().items():
+        with stage('create view ' + name):
+            start = time.perf_counter()
+            _execute(statement, text(viewdef.unique_index_statement.format(name)))
+            durations[name] = time.perf_counter() - start
+
+    return durations
+
+
+def refresh_views(concurrently: bool = True, max_workers: int = 4) -> dict[str, float]:
+    if is_embedded():
+        # the embedded engines parallelise a single query themselves and serialise writers anyway
+        return dict(_rebuild_view(name) for name in viewdef.view_queries)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(executor.map(lambda name: _refresh_view(name, concurrently), viewdef.materialized_views))
+
+
+def drop_views():
+    kind = get_view_kind()
+    _execute(*[text('DROP {} IF EXISTS {}'.format(kind, name)) for name in viewdef.materialized_views])
+
+
+def _get_create_statements() -> dict[str, text]:
+    if not is_embedded():
+        return viewdef.materialized_views
+
+    return {
+        name: text('CREATE TABLE IF NOT EXISTS {} AS {}'.format(name, query))
+        for name, query in viewdef.view_queries.items()
+    }
+
+
+def _refresh_view(name: str, concurrently: bool) -> tuple[str, float]:
+    start = time.perf_counter()
+    with stage('refresh view ' + name):
+        _execute(text('REFRESH MATERIALIZED VIEW {}{}'.format('CONCURRENTLY ' if concurrently else '', name)))
+
+    return name, time.perf_counter() - start
+
+
+def _rebuild_view(name: str) -> tuple[str, float]:
+    start = time.perf_counter()
+    with stage('refresh view ' + name):
+        # rebuilt rather than emptied and refilled, DuckDB rejects reinserting keys deleted in the same transaction
+        _execute(
+            text('DROP TABLE IF EXISTS {}'.format(name)),
+            _get_create_statements()[name],
+            text(viewdef.unique_index_statement.format(name))
+        )
+
+    return name, time.perf_counter() - start
+
+
+def _execute(*statements: text):
+    Connection = get_connection()
+    with Connection() as conn:
+        for statement in statements:
+            conn.execute(statement)
+        conn.commit()
@@ -1,58 +1,209 @@
-import f1predictions.etl.view_definitions as viewdef
+from functools import partial
+from typing import Iterator, Optional
+import pandas as pd
 
 from f1predictions.etl.transformer import get_drivers_transformer, get_rounds_transformer, get_statuses_transformer, \
    get_drivers_categories_transformer, get_drivers_constructors_transformer, \
    get_constructors_transformer, get_drivers_ratings_transformer, get_drivers_standings_transformer, \
    get_constructors_standings_transformer, get_races_transformer, get_race_drivers_results_transformer, \
    get_race_constructors_results_transformer, get_qualifying_results_transformer, \
-   get_circuits_transformer, get_lap_times_transformer
-
-from f1predictions.etl.loader import load_data, load_view
-from f1predictions.orm.config.database import clear_database
-
-
-def load_models():
-    print("Clearing database...")
-    clear_database()
-
-    print("Loading drivers...")
-    load_data(get_drivers_transformer().transform_to_model())
-    print("Loading circuits...")
-    load_data(get_circuits_transformer().transform_to_model())
-    print("Loading statuses...")
-    load_data(get_statuses_transformer().transform_to_model())
-    print("Loading constructors...")
-    load_data(get_constructors_transformer().transform_to_model())
-    print("Loading races...")
-    load_data(get_races_transformer().transform_to_model())
-    print("Loading rounds...")
-    load_data(get_rounds_transformer().transform_to_model())
-    print("Loading drivers constructors...")
-    load_data(get_drivers_constructors_transformer().transform_to_model())
-    print("Loading drivers results...")
-    load_data(get_race_drivers_results_transformer().transform_to_model())
-    print("Loading constructors results...")
-    load_data(get_race_constructors_results_transformer().transform_to_model())
-    print("Loading qualifying results...")
-    load_data(get_qualifying_results_transformer().transform_to_model())
-    print("Loading lap times...")
-    load_data(get_lap_times_transformer().transform_to_model())
-    print("Loading drivers standings...")
-    load_data(get_drivers_standings_transformer().transform_to_model())
-    print("Loading constructor standings...")
-    load_data(get_constructors_standings_transformer().transform_to_model())
-    print("Loading saved drivers ratings...")
-    load_data(get_drivers_ratings_transformer().transform_to_model())
-    print("Loading saved drivers categories...")
-    load_data(get_drivers_categories_transformer().transform_to_model())
+   get_circuits_transformer, get_lap_times_transformer, Transformer
+
+from f1predictions.etl.aggregates import INPUT_TABLES, compute_views as compute_views_from_frames
+from f1predictions.etl.instrumentation import stage, instrument_frames, get_records, get_record_count, format_summary
+from f1predictions.etl.loader import load_frames, upsert_frames, replace_frame
+from f1predictions.etl.scheduler import LoadStep, StepTiming, run_steps, format_timings
+from f1predictions.etl.views import create_views, refresh_views
+from f1predictions.orm.config.database import truncate_tables, create_missing_tables, drop_indexes, create_indexes, \
+   analyze_tables, bump_data_version as bump_database_version, get_backend, is_embedded
+from f1predictions.orm.config.statements import reset_statement_stats, format_statement_report
+from f1predictions.orm.dbal.featurestore import FeatureStore, invalidate_feature_store
+from f1predictions.orm.query import invalidate_query_cache
+from f1predictions.orm.entity import Driver, Circuit, Status, Constructor, Race, Round, DriverConstructor, \
+   RaceDriverResult, RaceConstructorResult, QualifyingResult, LapTimes, RaceDriverStandings, RaceConstructorStandings, \
+   DriverRating, DriverCategory
+from f1predictions.utils import create_rounds_dataframe
+
+_CHUNK_SIZE = 100000
+
+LOAD_STEPS = [
+    LoadStep('drivers', Driver, get_drivers_transformer),
+    LoadStep('circuits', Circuit, get_circuits_transformer),
+    LoadStep('statuses', Status, get_statuses_transformer),
+    LoadStep('constructors', Constructor, get_constructors_transformer),
+    LoadStep('races', Race, get_races_transformer),
+    LoadStep('rounds', Round, get_rounds_transformer),
+    LoadStep('drivers constructors', DriverConstructor, get_drivers_constructors_transformer, reads=('round',)),
+    LoadStep('drivers results', RaceDriverResult, get_race_drivers_results_transformer),
+    LoadStep('constructors results', RaceConstructorResult, get_race_constructors_results_transformer),
+    LoadStep('qualifying results', QualifyingResult, get_qualifying_results_transformer),
+    LoadStep('lap times', LapTimes, get_lap_times_transformer),
+    LoadStep('drivers standings', RaceDriverStandings, get_drivers_standings_transformer,
+             reads=('race_driver_result', 'round')),
+    LoadStep('constructor standings', RaceConstructorStandings, get_constructors_standings_transformer,
+             reads=('race_driver_result', 'driver_constructor', 'round')),
+    LoadStep('saved drivers ratings', DriverRating, get_drivers_ratings_transformer),
+    LoadStep('saved drivers categories', DriverCategory, get_drivers_categories_transformer),
+]
+
+
+def load_models(max_parallelism: int = 4, use_processes: bool = False,
+                compute_views: bool = False) -> Optional[FeatureStore]:
+    first_record = get_record_count()
+    reset_statement_stats()
+    if compute_views and use_processes:
+        raise ValueError('Results views are computed from the frames of the load, which worker processes do not return')
+    if is_embedded():
+        # the database file belongs to this process, and SQLite takes a single writer at a time
+        use_processes = False
+        max_parallelism = 1 if 'sqlite' == get_backend() else max_parallelism
+
+    print("Clearing tables...")
+    create_missing_tables()
+    truncate_tables()
+    drop_indexes()
+
+    # the frames loaded into the results views' source tables are kept, so the views can be computed without reading
+    # the tables back
+    kept_frames = {table: [] for table in INPUT_TABLES} if compute_views else None
+    run = partial(load_step, kept_frames=kept_frames) if compute_views else load_step
+    timings = run_steps(LOAD_STEPS, run, max_parallelism, use_processes, _report_start, _report_finish)
+
+    print("Creating indexes...")
+    with stage('indexes'):
+        create_indexes()
+        analyze_tables()
+    # the views kept serving the previous data during the load and only now switch to the new one
+    refresh_materialized_views()
+
+    store = None
+    if compute_views:
+        print("Computing results views in memory...")
+        with stage('compute views'):
+            store = FeatureStore.from_frames(
+                compute_views_from_frames(*[pd.concat(kept_frames[table], ignore_index=True) for table in INPUT_TABLES])
+            )
+
+    print(format_timings(timings))
+    print(format_summary(get_records(first_record)))
+    print(format_statement_report())
+
+    return store
+
+
+def ingest_models():
+    first_record = get_record_count()
+    reset_statement_stats()
+    print("Creating missing tables...")
+    create_missing_tables()
+    create_indexes()
+
+    print("Ingesting drivers...")
+    _ingest(get_drivers_transformer())
+    print("Ingesting circuits...")
+    _ingest(get_circuits_transformer())
+    print("Ingesting statuses...")
+    _ingest(get_statuses_transformer())
+    print("Ingesting constructors...")
+    _ingest(get_constructors_transformer())
+    print("Ingesting races...")
+    _ingest(get_races_transformer())
+    print("Ingesting rounds...")
+    rounds = _ingest(get_rounds_transformer())
+    print("Ingesting drivers constructors...")
+    drivers_constructors = _ingest(get_drivers_constructors_transformer())
+    print("Ingesting drivers results...")
+    drivers_results = _ingest(get_race_drivers_results_transformer())
+    print("Ingesting constructors results...")
+    _ingest(get_race_constructors_results_transformer())
+    print("Ingesting qualifying results...")
+    _ingest(get_qualifying_results_transformer())
+    print("Ingesting lap times...")
+    _ingest(get_lap_times_transformer())
+
+    years = _get_affected_years(rounds, drivers_constructors, drivers_results)
+    if years:
+        print("Recomputing drivers standings for {}...".format(', '.join(str(year) for year in years)))
+        _replace_years(get_drivers_standings_transformer(years), years)
+        print("Recomputing constructor standings for {}...".format(', '.join(str(year) for year in years)))
+        _replace_years(get_constructors_standings_transformer(years), years)
+
+    print("Ingesting saved drivers ratings...")
+    _ingest(get_drivers_ratings_transformer())
+    print("Ingesting saved drivers categories...")
+    _ingest(get_drivers_categories_transformer())
+
+    refresh_materialized_views()
+    print(format_summary(get_records(first_record)))
+    print(format_statement_report())
+
+
+def load_step(step: LoadStep, kept_frames: Optional[dict[str, list[pd.DataFrame]]] = None):
+    # runs on a worker, the progress lines are printed by the scheduler's callbacks on the main thread instead
+    with stage(step.description):
+        frames = transform_step(step)
+        if kept_frames is not None and step.table in kept_frames:
+            frames = _keep_frames(frames, kept_frames[step.table])
+        load_frames(instrument_frames('transform ' + step.table, frames), step.model, report=False)
+
+
+def transform_step(step: LoadStep) -> Iterator[pd.DataFrame]:
+    return step.factory().transform_to_frames(_CHUNK_SIZE)
+
+
+def _report_start(step: LoadStep):
+    print("Loading {}...".format(step.description))
+
+
+def _report_finish(timing: StepTiming):
+    print("Loaded {} in {:.2f}s".format(timing.step.description, timing.duration))
+
+
+def _keep_frames(frames: Iterator[pd.DataFrame], kept: list[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    for frame in frames:
+        kept.append(frame)
+        yield frame
+
+
+def _ingest(transformer: Transformer) -> pd.DataFrame:
+    return upsert_frames(transformer.transform_to_frames(_CHUNK_SIZE), transformer.model)
+
+
+def _replace_years(transformer: Transformer, years: list[int]):
+    replace_frame(transformer.transform_to_frame(), transformer.model, 'year', years)
+
+
+def _get_affected_years(rounds: pd.DataFrame, drivers_constructors: pd.DataFrame,
+                        drivers_results: pd.DataFrame) -> list[int]:
+    rounds_years = create_rounds_dataframe().set_index('id')['year']
+    years = set(rounds['year']) | set(drivers_constructors['year']) | \
+        set(drivers_results['round_id'].map(rounds_years).dropna())
+
+    return sorted(int(year) for year in years)
 
 
 def create_materialized_views():
-    print('Creating drivers season results data materialized view')
-    load_view(viewdef.drivers_seasons_results_view)
-    print('Creating drivers\' opponents season results data materialized view')
-    load_view(viewdef.opponents_seasons_results_view)
-    print('Creating drivers round results data materialized view')
-    load_view(viewdef.drivers_rounds_results_view)
-    print('Creating drivers\' opponents round results data materialized view')
-    load_view(viewdef.opponents_rounds_results_view)
\ No newline at end of file
+    print('Creating materialized views')
+    _report_views(create_views())
+    bump_data_version()
+
+
+def refresh_materialized_views(concurrently: bool = True, max_workers: int = 4):
+    create_views()
+    print('Refreshing materialized views')
+    _report_views(refresh_views(concurrently, max_workers))
+    bump_data_version()
+
+
+def bump_data_version() -> int:
+    version = bump_database_version()
+    invalidate_feature_store()
+    invalidate_query_cache()
+    print('Data version is now {}'.format(version))
+
+    return version
+
+
+def _report_views(durations: dict[str, float]):
+    for name, duration in durations.items():
+        print('{} ready in {:.2f}s'.format(name, duration))
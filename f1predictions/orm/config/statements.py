@@ -0,0 +1,256 @@
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from typing import Callable, Optional
+from sqlalchemy import Engine, event
+from tabulate import tabulate
+
+_LOGGER = logging.getLogger(__name__)
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_CONFIG_DIR = os.path.dirname(os.path.abspath(__file__))
+_MAX_NORMALIZED = 10000
+_MAX_LOGGED_PARAMETERS = 200
+
+_NORMALIZE_PATTERNS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'%\(\w+\)s|%s|(?<!:):(?!:)\w+|\$\d+'), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+]
+
+_STATS_LOCK = threading.Lock()
+_STATS = {}
+_NORMALIZED = {}
+_ENGINE_SETTINGS = weakref.WeakKeyDictionary()
+_TIMING_LISTENERS = []
+
+
+class StatementStats:
+    def __init__(self, statement: str):
+        self.statement = statement
+        self.calls = 0
+        self.rows = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.slow_calls = 0
+        self.callers = Counter()
+
+    @property
+    def average_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'statement': self.statement,
+            'calls': self.calls,
+            'rows': self.rows,
+            'total_time': self.total_time,
+            'average_time': self.average_time,
+            'max_time': self.max_time,
+            'slow_calls': self.slow_calls,
+            'callers': dict(self.callers.most_common(5)),
+        }
+
+
+class _CountingCursor:
+    # DBAPI rowcount is -1 for a SELECT on SQLite and DuckDB, so returned rows are counted as they are fetched
+    def __init__(self, cursor, stats: StatementStats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def __getattr__(self, name: str):
+        return getattr(self._cursor, name)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._add_rows(1)
+
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._add_rows(len(rows))
+
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._add_rows(len(rows))
+
+        return rows
+
+    def _add_rows(self, count: int):
+        with _STATS_LOCK:
+            self._stats.rows += count
+
+
+def register_statement_listeners(engine: Engine, slow_query_ms: int = 0, explain: bool = False):
+    _ENGINE_SETTINGS[engine] = (slow_query_ms, explain)
+
+
+def add_timing_listener(listener: Callable[[float], None]):
+    # called with the duration of every statement on any engine, timed by the listeners below
+    _TIMING_LISTENERS.append(listener)
+
+
+def get_statement_stats() -> list[dict]:
+    with _STATS_LOCK:
+        stats = [stats.to_dict() for stats in _STATS.values()]
+
+    return sorted(stats, key=lambda stats: -stats['total_time'])
+
+
+def reset_statement_stats():
+    with _STATS_LOCK:
+        _STATS.clear()
+
+
+def get_repeated_statements(min_calls: int = 10) -> list[dict]:
+    # a parameterised lookup fired many times in one run is usually a loop that could be a single query
+    return [
+        stats for stats in get_statement_stats()
+        if stats['calls'] >= min_calls and stats['statement'].lstrip().upper().startswith(('SELECT', 'WITH'))
+        and '?' in stats['statement']
+    ]
+
+
+def format_statement_report(limit: int = 20, min_calls: int = 10) -> str:
+    stats = get_statement_stats()
+    lines = [tabulate(
+        [[_shorten(row['statement']), row['calls'], row['rows'], row['total_time'], row['average_time'] * 1000,
+          row['max_time'] * 1000, row['slow_calls']] for row in stats[:limit]],
+        headers=['statement', 'calls', 'rows', 'total s', 'avg ms', 'max ms', 'slow'], floatfmt='.3f'
+    )]
+
+    repeated = get_repeated_statements(min_calls)
+    if repeated:
+        lines.append('')
+        lines.append('Repeated statements (possible N+1 queries):')
+        lines.append(tabulate(
+            [[_shorten(row['statement']), row['calls'], row['total_time'],
+              ', '.join('{} ({})'.format(caller, count) for caller, count in row['callers'].items())]
+             for row in repeated],
+            headers=['statement', 'calls', 'total s', 'callers'], floatfmt='.3f'
+        ))
+
+    return '\n'.join(lines)
+
+
+def normalize_statement(statement: str) -> str:
+    normalized = _NORMALIZED.get(statement)
+    if normalized is None:
+        normalized = statement
+        for pattern, replacement in _NORMALIZE_PATTERNS:
+            normalized = pattern.sub(replacement, normalized)
+        normalized = normalized.strip()
+        if len(_NORMALIZED) < _MAX_NORMALIZED:
+            _NORMALIZED[statement] = normalized
+
+    return normalized
+
+
+def _record(statement: str, elapsed: float, rowcount: int, slow: bool) -> StatementStats:
+    key = normalize_statement(statement)
+    caller = _get_caller()
+    with _STATS_LOCK:
+        stats = _STATS.get(key)
+        if stats is None:
+            stats = _STATS[key] = StatementStats(key)
+        stats.calls += 1
+        stats.rows += max(rowcount, 0)
+        stats.total_time += elapsed
+        stats.max_time = max(stats.max_time, elapsed)
+        stats.slow_calls += slow
+        if caller is not None:
+            stats.callers[caller] += 1
+
+    return stats
+
+
+def _get_caller() -> Optional[str]:
+    # the closest frame of this package outside the database configuration
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_PACKAGE_DIR) and not filename.startswith(_CONFIG_DIR):
+            return '{}:{}'.format(os.path.relpath(filename, _PACKAGE_DIR), frame.f_code.co_name)
+        frame = frame.f_back
+
+    return None
+
+
+def _log_slow_query(conn, statement: str, parameters, elapsed: float, explain: bool):
+    message = 'Slow query ({:.1f} ms): {}\nParameters: {}'.format(
+        elapsed * 1000, statement.strip(), _shorten(repr(parameters), _MAX_LOGGED_PARAMETERS)
+    )
+    if explain and conn.dialect.name == 'postgresql' and statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+        message += '\n' + _explain(conn, statement, parameters)
+
+    _LOGGER.warning(message)
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    # a separate DBAPI cursor, so the plan is not recorded as a statement and the caller's results stay intact
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        # a failed EXPLAIN must not abort the caller's transaction
+        cursor.execute('SAVEPOINT explain_slow_query')
+        try:
+            cursor.execute('EXPLAIN (ANALYZE, BUFFERS) ' + statement, parameters)
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+            cursor.execute('RELEASE SAVEPOINT explain_slow_query')
+        except Exception as e:
+            cursor.execute('ROLLBACK TO SAVEPOINT explain_slow_query')
+            plan = 'EXPLAIN failed: {}'.format(e)
+    finally:
+        cursor.close()
+
+    return plan
+
+
+def _shorten(value: str, length: int = 100) -> str:
+    return value if len(value) <= length else value[:length - 3] + '...'
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('statement_start', []).append((cursor, time.perf_counter()))
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['statement_start'].pop()[1]
+    for listener in _TIMING_LISTENERS:
+        listener(elapsed)
+
+    settings = _ENGINE_SETTINGS.get(conn.engine)
+    if settings is None:
+        return
+
+    slow_query_ms, explain = settings
+    slow = 0 < slow_query_ms <= elapsed * 1000
+    returns_rows = cursor.description is not None and context is not None and context.cursor is cursor
+    stats = _record(statement, elapsed, 0 if returns_rows else cursor.rowcount, slow)
+    if returns_rows:
+        # the result is built from the context's cursor after this event, so the rows it fetches are counted
+        context.cursor = _CountingCursor(cursor, stats)
+    if slow:
+        _log_slow_query(conn, statement, parameters, elapsed, explain and not executemany)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(context):
+    # a failed statement never reaches after_cursor_execute, so its start is dropped here
+    if context.connection is None or context.execution_context is None:
+        return
+
+    starts = context.connection.info.get('statement_start')
+    if starts and starts[-1][0] is context.execution_context.cursor:
+        starts.pop()
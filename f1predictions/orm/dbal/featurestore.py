@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+from typing import Optional
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from f1predictions.orm.config.database import get_connection, get_data_version
+
+DRIVERS_ROUNDS_RESULTS = 'drivers_rounds_results_view'
+OPPONENTS_ROUNDS_RESULTS = 'opponents_rounds_results_view'
+DRIVERS_SEASONS_RESULTS = 'drivers_seasons_results_view'
+OPPONENTS_SEASONS_RESULTS = 'opponents_seasons_results_view'
+
+VIEWS = [DRIVERS_ROUNDS_RESULTS, OPPONENTS_ROUNDS_RESULTS, DRIVERS_SEASONS_RESULTS, OPPONENTS_SEASONS_RESULTS]
+
+_KEYS = ['driver_id', 'year']
+_FEATURE_STORE = None
+_FEATURE_STORE_LOCK = threading.Lock()
+
+
+class ViewFeatures:
+    def __init__(self, keys: np.ndarray, columns: list[str], values: np.ndarray):
+        self.keys = keys
+        self.columns = columns
+        self.values = values
+        self._positions = {(int(driver_id), int(year)): i for i, (driver_id, year) in enumerate(keys.tolist())}
+
+    def get_position(self, driver_id: int, year: int) -> int:
+        return self._positions.get((int(driver_id), int(year)), -1)
+
+    def get_pairs(self, year: Optional[int] = None) -> list[tuple[int, int]]:
+        keys = self.keys if year is None else self.keys[self.keys[:, 1] == int(year)]
+
+        return [(int(driver_id), int(key_year)) for driver_id, key_year in keys.tolist()]
+
+    def get_row(self, driver_id: int, year: int) -> Optional[dict]:
+        position = self.get_position(driver_id, year)
+        if -1 == position:
+            return None
+
+        return dict(zip(self.columns, self.values[position].tolist()))
+
+    def get_frame(self, pairs: list[tuple[int, int]]) -> pd.DataFrame:
+        pairs = list(dict.fromkeys((int(driver_id), int(year)) for driver_id, year in pairs))
+        positions = np.array([self._positions.get(pair, -1) for pair in pairs], dtype='int64')
+        positions = positions[positions != -1]
+
+        df = pd.DataFrame(self.values[positions], columns=self.columns)
+        df.insert(0, 'driver_id', self.keys[positions, 0])
+        df.insert(1, 'year', self.keys[positions, 1])
+
+        return df
+
+    @staticmethod
+    def from_frame(df: pd.DataFrame) -> 'ViewFeatures':
+        columns = [column for column in df.columns if column not in _KEYS]
+
+        return ViewFeatures(
+            df[_KEYS].to_numpy(dtype='int64').reshape(-1, 2),
+            columns,
+            df[columns].to_numpy(dtype='float64').reshape(-1, len(columns))
+        )
+
+
+class FeatureStore:
+    def __init__(self, snapshot_path: Optional[str] = None, check_interval: float = 1.0,
+                 views: Optional[dict[str, ViewFeatures]] = None):
+        self.snapshot_path = snapshot_path
+        self.check_interval = check_interval
+        self.version = None
+        # a store built from frames keeps them as they are, there is no database to check the version against
+        self._fixed = views is not None
+        self._views = views or {}
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def from_frames(frames: dict[str, pd.DataFrame]) -> 'FeatureStore':
+        missing = [view for view in VIEWS if view not in frames]
+        if missing:
+            raise ValueError('Missing frames for views: {}'.format(', '.join(missing)))
+
+        return FeatureStore(views={view: ViewFeatures.from_frame(frames[view]) for view in VIEWS})
+
+    def get_results(self, view: str, driver_id: int, year: int) -> Optional[dict]:
+        return self._get_view(view).get_row(driver_id, year)
+
+    def get_results_by_pairs(self, view: str, pairs: list[tuple[int, int]]) -> pd.DataFrame:
+        return self._get_view(view).get_frame(pairs)
+
+    def get_pairs(self, view: str, year: Optional[int] = None) -> list[tuple[int, int]]:
+        return self._get_view(view).get_pairs(year)
+
+    def invalidate(self):
+        if self._fixed:
+            return
+
+        with self._lock:
+            self.version, self._views, self._checked_at = None, {}, None
+
+    def save_snapshot(self, path: str):
+        if self._fixed:
+            raise ValueError('A feature store built from frames has no data version to snapshot')
+
+        with self._lock:
+            self._checked_at = None
+            self._ensure_current()
+            _save_snapshot(path, self.version, self._views)
+
+    def _get_view(self, view: str) -> ViewFeatures:
+        if view not in VIEWS:
+            raise ValueError('Unknown view {}, expected one of: {}'.format(view, ', '.join(VIEWS)))
+
+        with self._lock:
+            self._ensure_current()
+
+            return self._views[view]
+
+    def _ensure_current(self):
+        if self._fixed:
+            return
+
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+
+        version = get_data_version()
+        self._checked_at = now
+        if version == self.version:
+            return
+
+        views = _load_snapshot(self.snapshot_path, version)
+        if views is None:
+            views = {view: ViewFeatures.from_frame(fetch_view(view)) for view in VIEWS}
+            if self.snapshot_path:
+                _save_snapshot(self.snapshot_path, version, views)
+
+        self.version, self._views = version, views
+
+
+def get_feature_store() -> FeatureStore:
+    global _FEATURE_STORE
+    with _FEATURE_STORE_LOCK:
+        if _FEATURE_STORE is None:
+            _FEATURE_STORE = FeatureStore(os.environ.get('F1PREDICTIONS_FEATURE_SNAPSHOT'))
+
+        return _FEATURE_STORE
+
+
+def invalidate_feature_store():
+    if _FEATURE_STORE is not None:
+        _FEATURE_STORE.invalidate()
+
+
+def fetch_view(view: str) -> pd.DataFrame:
+    Connection = get_connection()
+    with Connection() as conn:
+        result = conn.execute(text('SELECT * FROM {}'.format(view)))
+
+        return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+
+def _load_snapshot(path: Optional[str], version: int) -> Optional[dict[str, ViewFeatures]]:
+    if not path or not os.path.exists(path):
+        return None
+
+    with np.load(path) as snapshot:
+        if int(snapshot['version']) != version:
+            return None
+
+        return {
+            view: ViewFeatures(
+                snapshot[view + '.keys'],
+                snapshot[view + '.columns'].tolist(),
+                snapshot[view + '.values']
+            )
+            for view in VIEWS
+        }
+
+
+def _save_snapshot(path: str, version: int, views: dict[str, ViewFeatures]):
+    arrays = {'version': np.array(version)}
+    for view, features in views.items():
+        arrays[view + '.keys'] = features.keys
+        arrays[view + '.columns'] = np.array(features.columns)
+        arrays[view + '.values'] = features.values
+
+    temporary = '{}.{}.tmp.npz'.format(path, os.getpid())
+    np.savez(temporary, **arrays)
+    os.replace(temporary, path)
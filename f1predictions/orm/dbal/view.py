@@ -12,9 +12,8 @@ def get_drivers_rounds_results(driver_id: int, year: int) -> pd.DataFrame:
     Connection = get_connection()
     with Connection() as conn:
         result = conn.execute(text(stmt), {'driver_id': driver_id, 'year': year})
-
-    df = pd.DataFrame(result.fetchall())
-    df.keys = result.keys()
+        df = pd.DataFrame(result.fetchall())
+        df.keys = result.keys()
 
     return df
 
@@ -26,9 +25,8 @@ def get_opponents_rounds_results(driver_id: int, year: int) -> pd.DataFrame:
     Connection = get_connection()
     with Connection() as conn:
         result = conn.execute(text(stmt), {'driver_id': driver_id, 'year': year})
-
-    df = pd.DataFrame(result.fetchall())
-    df.keys = result.keys()
+        df = pd.DataFrame(result.fetchall())
+        df.keys = result.keys()
 
     return df
 
@@ -40,9 +38,8 @@ def get_drivers_seasons_results(driver_id: int, year: int) -> pd.DataFrame:
     Connection = get_connection()
     with Connection() as conn:
         result = conn.execute(text(stmt), {'driver_id': driver_id, 'year': year})
-
-    df = pd.DataFrame(result.fetchall())
-    df.keys = result.keys()
+        df = pd.DataFrame(result.fetchall())
+        df.keys = result.keys()
 
     return df
 
@@ -55,8 +52,7 @@ def get_opponents_seasons_results(driver_id: int, year: int) -> pd.DataFrame:
     Connection = get_connection()
     with Connection() as conn:
         result = conn.execute(text(stmt), {'driver_id': driver_id, 'year': year})
+        df = pd.DataFrame(result.fetchall())
+        df.keys = result.keys()
 
-    df = pd.DataFrame(result.fetchall())
-    df.keys = result.keys()
-
-    return df
\ No newline at end of file
+    return df
@@ -1,5 +1,5 @@
 from typing import Optional
-from sqlalchemy import ForeignKey, String, Integer, Float, Enum
+from sqlalchemy import ForeignKey, String, Integer, Float, Enum, Index
 import sqlalchemy.orm as orm
 from f1predictions.orm.config.database import Base
 from f1predictions.orm.enums import DriverCategoryEnum
@@ -15,6 +15,9 @@ class Driver(Base):
 
 class Status(Base):
     __tablename__ = 'status'
+    __table_args__ = (
+        Index('ix_status_status', 'status'),
+    )
 
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     status: orm.Mapped[str] = orm.mapped_column(String(255))
@@ -29,6 +32,10 @@ class Constructor(Base):
 
 class DriverConstructor(Base):
     __tablename__ = 'driver_constructor'
+    __table_args__ = (
+        Index('ix_driver_constructor_constructor_id_year', 'constructor_id', 'year'),
+    )
+
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     year: orm.Mapped[int] = orm.mapped_column(Integer)
 
@@ -64,6 +71,10 @@ class Round(Base):
 
 class QualifyingResult(Base):
     __tablename__ = 'qualifying_result'
+    __table_args__ = (
+        Index('ix_qualifying_result_round_id_driver_constructor_id', 'round_id', 'driver_constructor_id'),
+        Index('ix_qualifying_result_driver_constructor_id', 'driver_constructor_id'),
+    )
 
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     position: orm.Mapped[int] = orm.mapped_column(Integer)
@@ -77,6 +88,10 @@ class QualifyingResult(Base):
 
 class RaceDriverResult(Base):
     __tablename__ = 'race_driver_result'
+    __table_args__ = (
+        Index('ix_race_driver_result_round_id_driver_constructor_id', 'round_id', 'driver_constructor_id'),
+        Index('ix_race_driver_result_driver_constructor_id', 'driver_constructor_id'),
+    )
 
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     points: orm.Mapped[float] = orm.mapped_column(Float)
@@ -101,6 +116,9 @@ class RaceConstructorResult(Base):
 
 class RaceDriverStandings(Base):
     __tablename__ = 'race_driver_standings'
+    __table_args__ = (
+        Index('ix_race_driver_standings_driver_constructor_id', 'driver_constructor_id'),
+    )
 
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     year: orm.Mapped[int] = orm.mapped_column(Integer)
@@ -125,6 +143,9 @@ class RaceConstructorStandings(Base):
 
 class LapTimes(Base):
     __tablename__ = 'lap_time'
+    __table_args__ = (
+        Index('ix_lap_time_round_id_driver_constructor_id', 'round_id', 'driver_constructor_id'),
+    )
 
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     lap: orm.Mapped[int] = orm.mapped_column(Integer)
@@ -137,6 +158,9 @@ class LapTimes(Base):
 
 class DriverRating(Base):
     __tablename__ = 'driver_rating'
+    __table_args__ = (
+        Index('ix_driver_rating_driver_id_year', 'driver_id', 'year'),
+    )
 
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     rating: orm.Mapped[float] = orm.mapped_column(Float)
@@ -147,6 +171,9 @@ class DriverRating(Base):
 
 class DriverCategory(Base):
     __tablename__ = 'driver_category'
+    __table_args__ = (
+        Index('ix_driver_category_driver_id_year', 'driver_id', 'year'),
+    )
 
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     category: orm.Mapped[Enum] = orm.mapped_column(Enum(DriverCategoryEnum))
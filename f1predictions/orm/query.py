@@ -1,11 +1,18 @@
+import threading
+import time
 from abc import ABC
-from typing import Sequence
+from collections import OrderedDict
+from typing import Sequence, Optional, Callable, Any
 
 from sqlalchemy import Select
 from sqlalchemy.orm import sessionmaker
 
+from f1predictions.orm.config.database import get_data_version
 from f1predictions.orm.entity import DriverRating, Driver, DriverCategory
 
+_QUERY_CACHE = None
+_MISSING = object()
+
 
 class Query(ABC):
     def __init__(self, session: sessionmaker):
@@ -13,7 +20,10 @@ class Query(ABC):
 
 
 class DriverQuery(Query):
-    def get_drivers(self) -> Sequence[Driver]:
+    def get_drivers(self, driver_ids: Optional[list[int]] = None) -> Sequence[Driver]:
+        if driver_ids is not None:
+            return self.get_drivers_by_ids(driver_ids)
+
         with self._sessionmaker() as session:
             return session.scalars(Select(Driver)).all()
 
@@ -21,6 +31,10 @@ class DriverQuery(Query):
         with self._sessionmaker() as session:
             return session.scalars(Select(Driver).filter_by(id=driver_id)).one_or_none()
 
+    def get_drivers_by_ids(self, driver_ids: list[int]) -> Sequence[Driver]:
+        with self._sessionmaker() as session:
+            return session.scalars(Select(Driver).where(Driver.id.in_(driver_ids))).all()
+
 
 class DriverRatingQuery(Query):
     def get_drivers_ratings(self) -> Sequence[DriverRating]:
@@ -47,4 +61,184 @@ class DriverCategoryQuery(Query):
 
     def get_drivers_categories_by_year(self, year: int) -> Sequence[DriverCategory]:
         with self._sessionmaker() as session:
-            return session.scalars(Select(DriverCategory).filter_by(year=year)).all()
\ No newline at end of file
+            return session.scalars(Select(DriverCategory).filter_by(year=year)).all()
+
+
+class QueryCache:
+    def __init__(self, max_size: int = 4096, ttl: float = 3600.0, check_interval: float = 1.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._checked_at = None
+        self._lock = threading.RLock()
+
+    def get(self, key: tuple, default: Any = None) -> Any:
+        with self._lock:
+            self._ensure_version()
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+    def put(self, key: tuple, value: Any):
+        with self._lock:
+            self._ensure_version()
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: tuple, loader: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.put(key, value)
+
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self.version, self._checked_at = None, None
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'version': self.version,
+            }
+
+    def _ensure_version(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+
+        version = get_data_version()
+        self._checked_at = now
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+
+def get_query_cache() -> QueryCache:
+    global _QUERY_CACHE
+    if _QUERY_CACHE is None:
+        _QUERY_CACHE = QueryCache()
+
+    return _QUERY_CACHE
+
+
+def invalidate_query_cache():
+    if _QUERY_CACHE is not None:
+        _QUERY_CACHE.invalidate()
+
+
+class CachedDriverQuery(DriverQuery):
+    def __init__(self, session: sessionmaker, cache: Optional[QueryCache] = None):
+        super().__init__(session)
+        self._cache = cache or get_query_cache()
+
+    def get_drivers(self, driver_ids: Optional[list[int]] = None) -> Sequence[Driver]:
+        if driver_ids is not None:
+            return self.get_drivers_by_ids(driver_ids)
+
+        return self._cache.get_or_load(('drivers',), self._load_drivers)
+
+    def get_driver(self, driver_id: int) -> Driver:
+        return self._cache.get_or_load(('driver', int(driver_id)), lambda: DriverQuery.get_driver(self, driver_id))
+
+    def get_drivers_by_ids(self, driver_ids: list[int]) -> Sequence[Driver]:
+        driver_ids = list(dict.fromkeys(int(driver_id) for driver_id in driver_ids))
+        drivers = {driver_id: self._cache.get(('driver', driver_id), _MISSING) for driver_id in driver_ids}
+
+        missing = [driver_id for driver_id, driver in drivers.items() if driver is _MISSING]
+        if missing:
+            fetched = {driver.id: driver for driver in DriverQuery.get_drivers_by_ids(self, missing)}
+            for driver_id in missing:
+                drivers[driver_id] = fetched.get(driver_id)
+                self._cache.put(('driver', driver_id), drivers[driver_id])
+
+        return [driver for driver in drivers.values() if driver is not None]
+
+    def _load_drivers(self) -> Sequence[Driver]:
+        drivers = DriverQuery.get_drivers(self)
+        for driver in drivers:
+            self._cache.put(('driver', driver.id), driver)
+
+        return drivers
+
+
+class CachedDriverRatingQuery(DriverRatingQuery):
+    def __init__(self, session: sessionmaker, cache: Optional[QueryCache] = None):
+        super().__init__(session)
+        self._cache = cache or get_query_cache()
+
+    def get_drivers_ratings(self) -> Sequence[DriverRating]:
+        return self._cache.get_or_load(('drivers_ratings',), self._load_drivers_ratings)
+
+    def get_driver_rating(self, driver_id: int, year: int) -> DriverRating:
+        return self._cache.get_or_load(
+            ('driver_rating', int(driver_id), int(year)),
+            lambda: DriverRatingQuery.get_driver_rating(self, driver_id, year)
+        )
+
+    def get_drivers_ratings_by_year(self, year: int) -> Sequence[DriverRating]:
+        return self._cache.get_or_load(
+            ('drivers_ratings_by_year', int(year)),
+            lambda: DriverRatingQuery.get_drivers_ratings_by_year(self, year)
+        )
+
+    def _load_drivers_ratings(self) -> Sequence[DriverRating]:
+        ratings = DriverRatingQuery.get_drivers_ratings(self)
+        for rating in ratings:
+            self._cache.put(('driver_rating', rating.driver_id, rating.year), rating)
+
+        return ratings
+
+
+class CachedDriverCategoryQuery(DriverCategoryQuery):
+    def __init__(self, session: sessionmaker, cache: Optional[QueryCache] = None):
+        super().__init__(session)
+        self._cache = cache or get_query_cache()
+
+    def get_drivers_categories(self) -> Sequence[DriverCategory]:
+        return self._cache.get_or_load(('drivers_categories',), self._load_drivers_categories)
+
+    def get_driver_category(self, driver_id: int, year: int) -> DriverCategory:
+        return self._cache.get_or_load(
+            ('driver_category', int(driver_id), int(year)),
+            lambda: DriverCategoryQuery.get_driver_category(self, driver_id, year)
+        )
+
+    def get_drivers_categories_by_year(self, year: int) -> Sequence[DriverCategory]:
+        return self._cache.get_or_load(
+            ('drivers_categories_by_year', int(year)),
+            lambda: DriverCategoryQuery.get_drivers_categories_by_year(self, year)
+        )
+
+    def _load_drivers_categories(self) -> Sequence[DriverCategory]:
+        categories = DriverCategoryQuery.get_drivers_categories(self)
+        for category in categories:
+            self._cache.put(('driver_category', category.driver_id, category.year), category)
+
+        return categories
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Callable, Iterable, Optional
 import numpy as np
+import pandas as pd
 from sklearn.model_selection import train_test_split
+from f1predictions.prediction.search import search, grow
 
 
 class AbstractBuilder(ABC):
@@ -14,6 +16,7 @@ class AbstractBuilder(ABC):
     test_size: float
     regressor: Any
     random_state: int
+    search_results: pd.DataFrame = None
 
     @abstractmethod
     def set_model(self, X, y):
@@ -25,6 +28,7 @@ class AbstractBuilder(ABC):
     @abstractmethod
     def create_train_test_set(self, test_size: float, random_state: int = 1):
         self.random_state = random_state
+        self.test_size = test_size
         if test_size < 0 or test_size > 1:
             raise ValueError('Test size must be between 0 and 1')
 
@@ -51,6 +55,23 @@ class AbstractBuilder(ABC):
 
         return X, y, X_test, y_test
 
+    def get_search_results(self) -> pd.DataFrame:
+        return self.search_results
+
+    def _search(self, create: Callable[[Any], Any], values: Iterable, n_jobs: Optional[int], halving: bool) -> Any:
+        X, y, X_test, y_test = self._get_model()
+        best, self.search_results = search(
+            create, values, X, y, X_test, y_test, n_jobs, halving, random_state=getattr(self, 'random_state', None)
+        )
+
+        return best
+
+    def _grow(self, estimator: Any, values: Iterable[int], oob: bool) -> Any:
+        X, y, X_test, y_test = self._get_model()
+        best, self.search_results = grow(estimator, values, X, y, X_test, y_test, oob)
+
+        return best
+
 
 class AbstractDecisionTreeBasedRegressorBuilder(AbstractBuilder):
     criterion: str
@@ -1,7 +1,7 @@
+from typing import Optional
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
-import sys
 
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.tree import DecisionTreeClassifier
@@ -27,29 +27,32 @@ class RandomForestClassifierBuilder(AbstractDecisionTreeBasedClassifierBuilder):
 
         return self
 
-    def create_classifier(self, max_n_optimizers: int = 8) -> 'RandomForestClassifierBuilder':
-        X, y, X_test, y_test = self._get_model()
-
+    def create_classifier(self, max_n_optimizers: int = 8, n_jobs: Optional[int] = None, halving: bool = False,
+                          incremental: bool = False, oob: bool = False) -> 'RandomForestClassifierBuilder':
         if self.criterion is None:
             raise ValueError('Criterion has not been set')
 
-        best_classifier = RandomForestClassifier(
-            criterion=self.criterion, n_estimators=1, random_state=self.random_state
-        )
+        if oob and not incremental:
+            raise ValueError('Out-of-bag scoring is only available in incremental mode')
 
-        best_score = -1 * sys.maxsize
+        if incremental:
+            if halving:
+                raise ValueError('Incremental mode cannot be combined with halving')
 
-        for i in range(1, max_n_optimizers):
-            Classifier = RandomForestClassifier(
-                criterion=self.criterion, n_estimators=i, random_state=self.random_state
+            self.classifier = self._grow(
+                RandomForestClassifier(criterion=self.criterion, random_state=self.random_state, n_jobs=n_jobs),
+                range(1, max(max_n_optimizers, 2)),
+                oob
             )
 
-            Classifier.fit(X, y)
-            score = Classifier.score(X_test, y_test)
-            if score > best_score:
-                best_classifier, best_score = Classifier, score
+            return self
 
-        self.classifier = best_classifier
+        self.classifier = self._search(
+            lambda i: RandomForestClassifier(criterion=self.criterion, n_estimators=i, random_state=self.random_state),
+            range(1, max(max_n_optimizers, 2)),
+            n_jobs,
+            halving
+        )
 
         return self
 
@@ -75,25 +78,17 @@ class DecisionTreeClassifierBuilder(AbstractDecisionTreeBasedClassifierBuilder):
 
         return self
 
-    def create_classifier(self, max_depth: int) -> 'DecisionTreeClassifierBuilder':
-        X, y, X_test, y_test = self._get_model()
-
+    def create_classifier(self, max_depth: int, n_jobs: Optional[int] = None,
+                          halving: bool = False) -> 'DecisionTreeClassifierBuilder':
         if self.criterion is None:
             raise ValueError('Criterion has not been set')
 
-        best_classifier = DecisionTreeClassifier(criterion=self.criterion, max_depth=1)
-
-        best_score = -1 * sys.maxsize
-
-        for i in range(1, max_depth):
-            classifier = DecisionTreeClassifier(criterion=self.criterion, max_depth=i)
-
-            classifier.fit(X, y)
-            score = classifier.score(X_test, y_test)
-            if score > best_score:
-                best_classifier, best_score = classifier, score
-
-        self.classifier = best_classifier
+        self.classifier = self._search(
+            lambda i: DecisionTreeClassifier(criterion=self.criterion, max_depth=i),
+            range(1, max(max_depth, 2)),
+            n_jobs,
+            halving
+        )
 
         return self
 
@@ -169,18 +164,16 @@ class KNNClassifierBuilder(AbstractBuilder):
 
         return self
 
-    def create_classifier(self, n_neighbors: int, algorithm: str = None) -> 'KNNClassifierBuilder':
-        X, y, X_test, y_test = self._get_model()
+    def create_classifier(self, n_neighbors: int, algorithm: str = None, n_jobs: Optional[int] = None,
+                          halving: bool = False) -> 'KNNClassifierBuilder':
         algorithm = algorithm if algorithm is not None else 'auto'
 
-        self.classifier = KNeighborsClassifier(n_neighbors=1, algorithm=algorithm)
-        self.classifier.fit(X, y)
-        best_score = self.classifier.score(X_test, y_test)
-        for i in range(1, n_neighbors):
-            classifier = KNeighborsClassifier(n_neighbors=i, algorithm=algorithm)
-            classifier.fit(X, y)
-            if classifier.score(X_test, y_test) > best_score:
-                self.classifier = classifier
+        self.classifier = self._search(
+            lambda i: KNeighborsClassifier(n_neighbors=i, algorithm=algorithm),
+            range(1, max(n_neighbors, 2)),
+            n_jobs,
+            halving
+        )
 
         return self
 
@@ -1,3 +1,24 @@
+from dataclasses import dataclass
+from typing import Iterable, Optional
+import numpy as np
+import pandas as pd
+
+FEATURES = [
+    'wins',
+    'season_position',
+    'avg_qualifying_position',
+    'q2_appearances',
+    'q3_appearances',
+    'pole_positions',
+    'front_row_second',
+    'podiums',
+    'dnfs',
+    'head_to_head_qualifying',
+    'percentage_constructor_points',
+]
+
+
+@dataclass(slots=True)
 class DriverRatingModel:
     driver_id: int
     name: str
@@ -14,37 +35,18 @@ class DriverRatingModel:
     head_to_head_qualifying: bool
     percentage_constructor_points: float
 
-    def __init__(
-            self,
-            driver_id,
-            name,
-            surname,
-            wins,
-            position,
-            average_quali_position,
-            q2s,
-            q3s,
-            poles,
-            front_rows,
-            podiums,
-            dnfs,
-            head_to_head_qualifying,
-            percentage_constructor_points
-    ):
-        self.driver_id = driver_id
-        self.name = name
-        self.surname = surname
-        self.wins = int(wins)
-        self.position = int(position)
-        self.average_quali_position = float(average_quali_position)
-        self.q2s = int(q2s)
-        self.q3s = int(q3s)
-        self.poles = int(poles)
-        self.front_rows = int(front_rows)
-        self.podiums = int(podiums)
-        self.dnfs = int(dnfs)
-        self.head_to_head_qualifying = bool(head_to_head_qualifying)
-        self.percentage_constructor_points = float(percentage_constructor_points)
+    def __post_init__(self):
+        self.wins = int(self.wins)
+        self.position = int(self.position)
+        self.average_quali_position = float(self.average_quali_position)
+        self.q2s = int(self.q2s)
+        self.q3s = int(self.q3s)
+        self.poles = int(self.poles)
+        self.front_rows = int(self.front_rows)
+        self.podiums = int(self.podiums)
+        self.dnfs = int(self.dnfs)
+        self.head_to_head_qualifying = bool(self.head_to_head_qualifying)
+        self.percentage_constructor_points = float(self.percentage_constructor_points)
 
     def to_list(self) -> list:
         return [
@@ -61,18 +63,87 @@ class DriverRatingModel:
             self.percentage_constructor_points
         ]
 
+    def to_numpy(self) -> np.ndarray:
+        # a record holds Python scalars, so this is always a copy; DriverRatingBatch hands out views instead
+        return np.array(self.to_list(), dtype='float64')
 
+
+@dataclass(slots=True)
 class DriverCategoryModel:
     driver_rating_model: DriverRatingModel
     rating: float
 
-    def __init__(self, driver_rating_model: DriverRatingModel, rating: float):
-        self.driver_rating_model = driver_rating_model
-        self.rating = rating
-
     def to_list(self) -> list:
         model_list = self.driver_rating_model.to_list()
         model_list.append(self.rating)
 
         return model_list
 
+    def to_numpy(self) -> np.ndarray:
+        values = np.empty(len(FEATURES) + 1, dtype='float64')
+        values[:-1] = self.driver_rating_model.to_list()
+        values[-1] = self.rating
+
+        return values
+
+
+class DriverRatingBatch:
+    __slots__ = ('driver_ids', 'years', '_matrix')
+
+    def __init__(self, driver_ids: np.ndarray, years: np.ndarray, features: np.ndarray,
+                 ratings: Optional[np.ndarray] = None):
+        features = np.asarray(features, dtype='float64').reshape(-1, len(FEATURES))
+        if len(features) != len(driver_ids) or len(features) != len(years):
+            raise ValueError('Batch needs one driver id and year per feature row, got {} ids, {} years and {} rows'
+                             .format(len(driver_ids), len(years), len(features)))
+
+        self.driver_ids = np.asarray(driver_ids, dtype='int64')
+        self.years = np.asarray(years, dtype='int64')
+        # column-major, so the feature block, the rating column and every single feature are contiguous views
+        self._matrix = np.empty((len(features), len(FEATURES) + 1), dtype='float64', order='F')
+        self._matrix[:, :-1] = features
+        self._matrix[:, -1] = np.nan if ratings is None else ratings
+
+    def __len__(self) -> int:
+        return len(self._matrix)
+
+    @property
+    def columns(self) -> list[str]:
+        return FEATURES
+
+    @property
+    def ratings(self) -> np.ndarray:
+        return self._matrix[:, -1]
+
+    def set_ratings(self, ratings: np.ndarray) -> 'DriverRatingBatch':
+        self._matrix[:, -1] = ratings
+
+        return self
+
+    def get_column(self, column: str) -> np.ndarray:
+        return self._matrix[:, FEATURES.index(column)]
+
+    def to_numpy(self) -> np.ndarray:
+        return self._matrix[:, :-1]
+
+    def to_category_numpy(self) -> np.ndarray:
+        if np.isnan(self.ratings).any():
+            raise ValueError('Ratings must be set before building the category features')
+
+        return self._matrix
+
+    def get_pairs(self) -> list[tuple[int, int]]:
+        return list(zip(self.driver_ids.tolist(), self.years.tolist()))
+
+    @staticmethod
+    def from_frame(df: pd.DataFrame) -> 'DriverRatingBatch':
+        return DriverRatingBatch(df['driver_id'].to_numpy(), df['year'].to_numpy(), df[FEATURES].to_numpy())
+
+    @staticmethod
+    def from_models(models: Iterable[DriverRatingModel], years: Iterable[int]) -> 'DriverRatingBatch':
+        models = list(models)
+        features = np.fromiter((value for model in models for value in model.to_list()), dtype='float64',
+                               count=len(models) * len(FEATURES))
+
+        return DriverRatingBatch(np.array([model.driver_id for model in models], dtype='int64'),
+                                 np.fromiter(years, dtype='int64', count=len(models)), features)
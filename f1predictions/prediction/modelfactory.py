@@ -1,47 +1,109 @@
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+from f1predictions.orm.entity import Driver
 from f1predictions.orm.query import DriverQuery
-from f1predictions.prediction.model import DriverRatingModel, DriverCategoryModel
-from f1predictions.orm.dbal.view import *
+from f1predictions.prediction.model import DriverRatingModel, DriverCategoryModel, DriverRatingBatch, FEATURES
+from f1predictions.orm.dbal.featurestore import FeatureStore, get_feature_store, DRIVERS_ROUNDS_RESULTS, \
+    OPPONENTS_ROUNDS_RESULTS, DRIVERS_SEASONS_RESULTS, OPPONENTS_SEASONS_RESULTS
+
+INTEGER_FEATURES = [
+    'wins',
+    'season_position',
+    'q2_appearances',
+    'q3_appearances',
+    'pole_positions',
+    'front_row_second',
+    'podiums',
+    'dnfs',
+]
 
 
 class DriverRatingsModelFactory:
-    def __init__(self, driver_query: DriverQuery):
+    def __init__(self, driver_query: DriverQuery, feature_store: Optional[FeatureStore] = None):
         self._driver_query = driver_query
+        self._feature_store = feature_store or get_feature_store()
 
     def create_driver_ratings_model(self, driver_id: int, year: int) -> DriverRatingModel:
-        df = self._build_dataframe(driver_id, year)
-        driver = self._driver_query.get_driver(driver_id)
-        h2h_qualifying = self.calculate_head_to_head_qualifying_result(df)
-
-        return DriverRatingModel(
-            driver.id,
-            driver.name,
-            driver.surname,
-            df['wins'].iloc[0],
-            df['season_position'].iloc[0],
-            df['avg_qualifying_position'].iloc[0],
-            df['q2_appearances'].iloc[0],
-            df['q3_appearances'].iloc[0],
-            df['pole_positions'].iloc[0],
-            df['front_row_second'].iloc[0],
-            df['podiums'].iloc[0],
-            df['dnfs'].iloc[0],
-            h2h_qualifying,
-            0 if 0 == df['season_points_os'].iloc[0] else 100 * df['season_points'].iloc[0] / (
-                    df['season_points'].iloc[0] + df['season_points_os'].iloc[0])
-        )
+        return self.create_driver_ratings_models([(driver_id, year)])[0]
 
-    @staticmethod
-    def _build_dataframe(driver_id, year) -> pd.DataFrame:
-        return get_drivers_rounds_results(driver_id, year) \
-            .join(get_opponents_rounds_results(driver_id, year).set_index('driver_id'), on='driver_id', rsuffix='_o') \
-            .join(get_drivers_seasons_results(driver_id, year).set_index('driver_id'), on='driver_id', rsuffix='_s') \
-            .join(get_opponents_seasons_results(driver_id, year).set_index('driver_id'), on='driver_id', rsuffix='_os')
+    def create_driver_ratings_models(self, pairs: list[tuple[int, int]]) -> list[DriverRatingModel]:
+        df = self.build_feature_frame(pairs)
+        drivers = self.get_drivers(df['driver_id'].unique())
+
+        return [
+            DriverRatingModel(
+                driver_id,
+                drivers[driver_id].name,
+                drivers[driver_id].surname,
+                *features
+            )
+            for driver_id, features in zip(df['driver_id'].tolist(), df[FEATURES].itertuples(index=False))
+        ]
+
+    def get_drivers(self, driver_ids) -> dict[int, Driver]:
+        return {driver.id: driver for driver in self._driver_query.get_drivers_by_ids(
+            [int(driver_id) for driver_id in driver_ids]
+        )}
+
+    def get_season_pairs(self, year: int) -> list[tuple[int, int]]:
+        seasons = set(self._feature_store.get_pairs(DRIVERS_SEASONS_RESULTS, year))
+
+        return [pair for pair in self._feature_store.get_pairs(DRIVERS_ROUNDS_RESULTS, year) if pair in seasons]
+
+    def build_feature_matrix(self, pairs: list[tuple[int, int]]) -> np.ndarray:
+        return self.build_batch(pairs).to_numpy()
+
+    def build_batch(self, pairs: list[tuple[int, int]]) -> DriverRatingBatch:
+        return DriverRatingBatch.from_frame(self.build_feature_frame(pairs))
+
+    def build_feature_frame(self, pairs: list[tuple[int, int]]) -> pd.DataFrame:
+        df = self._build_dataframe(pairs)
+
+        missing = df['avg_qualifying_position'].isna() | df['season_position'].isna()
+        if missing.any():
+            raise ValueError('Missing results data for (driver_id, year) pairs: {}'.format(
+                list(df.loc[missing, ['driver_id', 'year']].drop_duplicates().itertuples(index=False, name=None))
+            ))
+
+        df[INTEGER_FEATURES] = np.trunc(df[INTEGER_FEATURES])
+        df['head_to_head_qualifying'] = self.calculate_head_to_head_qualifying_result(df)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            df['percentage_constructor_points'] = np.where(
+                0 == df['season_points_os'],
+                0.0,
+                100 * df['season_points'] / (df['season_points'] + df['season_points_os'])
+            )
+
+        return df
+
+    def _build_dataframe(self, pairs: list[tuple[int, int]]) -> pd.DataFrame:
+        keys = ['driver_id', 'year']
+        store = self._feature_store
+        df = pd.DataFrame([(int(driver_id), int(year)) for driver_id, year in pairs], columns=keys) \
+            .merge(store.get_results_by_pairs(DRIVERS_ROUNDS_RESULTS, pairs), on=keys, how='left') \
+            .merge(store.get_results_by_pairs(OPPONENTS_ROUNDS_RESULTS, pairs), on=keys, how='left',
+                   suffixes=('', '_o')) \
+            .merge(store.get_results_by_pairs(DRIVERS_SEASONS_RESULTS, pairs), on=keys, how='left',
+                   suffixes=('', '_s')) \
+            .merge(store.get_results_by_pairs(OPPONENTS_SEASONS_RESULTS, pairs), on=keys, how='left',
+                   suffixes=('', '_os'))
+
+        numeric_columns = [column for column in df.columns if column not in keys]
+        df[numeric_columns] = df[numeric_columns].astype('float64')
+
+        return df
 
     @staticmethod
-    def calculate_head_to_head_qualifying_result(df) -> bool:
-        return df['q3_appearances'].iloc[0] > df['q3_appearances_o'].iloc[0] \
-            if round(df['avg_qualifying_position'].iloc[0]) == (df['avg_qualifying_position_o'].iloc[0]) \
-            else round(df['avg_qualifying_position'].iloc[0]) < (df['avg_qualifying_position_o'].iloc[0])
+    def calculate_head_to_head_qualifying_result(df) -> np.ndarray:
+        rounded_position = np.round(df['avg_qualifying_position'])
+
+        return np.where(
+            rounded_position == df['avg_qualifying_position_o'],
+            df['q3_appearances'] > df['q3_appearances_o'],
+            rounded_position < df['avg_qualifying_position_o']
+        )
 
 
 class DriverCategoryModelFactory:
@@ -51,4 +113,4 @@ class DriverCategoryModelFactory:
     def create_driver_category_model(self, driver_id: int, year: int, rating: float) -> DriverCategoryModel:
         return DriverCategoryModel(
             self.driver_ratings_model_factory.create_driver_ratings_model(driver_id, year), rating
-        )
\ No newline at end of file
+        )
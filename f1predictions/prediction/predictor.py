@@ -0,0 +1,64 @@
+from typing import Any, Optional
+import pandas as pd
+
+from f1predictions.orm.enums import DriverCategoryEnum
+from f1predictions.prediction.modelfactory import DriverRatingsModelFactory, FEATURES
+from f1predictions.prediction.registry import ModelArtifact
+
+_CATEGORY_NAMES = {category.value: category.name for category in DriverCategoryEnum}
+
+
+class Predictor:
+    def __init__(self, driver_ratings_model_factory: DriverRatingsModelFactory, rating_estimator: Any,
+                 category_estimator: Optional[Any] = None):
+        self.driver_ratings_model_factory = driver_ratings_model_factory
+        self.rating_estimator = rating_estimator
+        self.category_estimator = category_estimator
+
+    @staticmethod
+    def from_artifacts(driver_ratings_model_factory: DriverRatingsModelFactory, rating_artifact: ModelArtifact,
+                       category_artifact: Optional[ModelArtifact] = None) -> 'Predictor':
+        for artifact, features in [(rating_artifact, FEATURES), (category_artifact, FEATURES + ['rating'])]:
+            if artifact is not None and artifact.features is not None and artifact.features != features:
+                raise ValueError('Model {} version {} was trained on features {}, expected {}'.format(
+                    artifact.name, artifact.version, artifact.features, features
+                ))
+
+        return Predictor(
+            driver_ratings_model_factory,
+            rating_artifact.estimator,
+            category_artifact.estimator if category_artifact is not None else None
+        )
+
+    def predict(self, pairs: list[tuple[int, int]], include_features: bool = False) -> pd.DataFrame:
+        if not pairs:
+            raise ValueError('At least one (driver_id, year) pair is required')
+
+        batch = self.driver_ratings_model_factory.build_batch(pairs)
+        X = batch.to_numpy()
+
+        result = pd.DataFrame({'driver_id': batch.driver_ids, 'year': batch.years})
+        drivers = self.driver_ratings_model_factory.get_drivers(result['driver_id'].unique())
+        result['name'] = result['driver_id'].map({driver_id: driver.name for driver_id, driver in drivers.items()})
+        result['surname'] = result['driver_id'].map({
+            driver_id: driver.surname for driver_id, driver in drivers.items()
+        })
+        if include_features:
+            result[FEATURES] = X
+
+        batch.set_ratings(self.rating_estimator.predict(X))
+        result['rating'] = batch.ratings
+        if self.category_estimator is not None:
+            # same layout as DriverCategoryModel.to_list(), the predicted rating comes last
+            category = self.category_estimator.predict(batch.to_category_numpy())
+            result['category'] = pd.Series(category, index=result.index).astype('int64').map(_CATEGORY_NAMES)
+
+        return result
+
+    def predict_season(self, year: int, include_features: bool = False) -> pd.DataFrame:
+        pairs = self.driver_ratings_model_factory.get_season_pairs(year)
+        if not pairs:
+            raise ValueError('No results data for season {}'.format(year))
+
+        return self.predict(pairs, include_features) \
+            .sort_values(['rating', 'driver_id'], ascending=[False, True], ignore_index=True)
@@ -0,0 +1,137 @@
+import datetime
+import json
+import os
+from typing import Any, Optional
+import joblib
+
+from f1predictions.prediction import AbstractBuilder
+
+_MODELDIR = os.environ.get('F1PREDICTIONS_MODEL_DIR', os.path.dirname(__file__) + '/../../artifacts')
+_ESTIMATOR_FILE = 'model.joblib'
+_METADATA_FILE = 'metadata.json'
+
+
+class ModelArtifact:
+    def __init__(self, name: str, version: int, path: str, metadata: dict):
+        self.name = name
+        self.version = version
+        self.path = path
+        self.metadata = metadata
+        self._estimator = None
+
+    @property
+    def estimator(self) -> Any:
+        if self._estimator is None:
+            # artifacts are stored uncompressed, so the fitted arrays are memory-mapped instead of copied
+            self._estimator = joblib.load(os.path.join(self.path, _ESTIMATOR_FILE), mmap_mode='r')
+
+        return self._estimator
+
+    @property
+    def features(self) -> Optional[list[str]]:
+        return self.metadata.get('features')
+
+    @property
+    def data_version(self) -> Optional[int]:
+        return self.metadata.get('data_version')
+
+    @property
+    def scores(self) -> dict:
+        return self.metadata.get('scores', {})
+
+
+class ModelRegistry:
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or _MODELDIR
+
+    def save(self, name: str, builder: AbstractBuilder, features: Optional[list[str]] = None,
+             data_version: Optional[int] = None, metadata: Optional[dict] = None) -> ModelArtifact:
+        estimator = builder.get()
+        if estimator is None:
+            raise ValueError('Builder has no trained estimator to save')
+
+        metadata = {
+            'name': name,
+            'estimator': type(estimator).__name__,
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'features': list(features) if features is not None else None,
+            'data_version': data_version,
+            'random_state': getattr(builder, 'random_state', None),
+            'test_size': getattr(builder, 'test_size', None),
+            'scores': _get_scores(builder, estimator),
+            **(metadata or {}),
+        }
+
+        version, path = self._create_version_directory(name)
+        metadata['version'] = version
+        joblib.dump(estimator, os.path.join(path, _ESTIMATOR_FILE))
+        with open(os.path.join(path, _METADATA_FILE), 'w') as file:
+            json.dump(metadata, file, indent=2, default=_to_json)
+
+        return ModelArtifact(name, version, path, metadata)
+
+    def get(self, name: str, version: Optional[int] = None) -> ModelArtifact:
+        versions = self.get_versions(name)
+        if not versions:
+            raise ValueError('No saved versions of model {}'.format(name))
+
+        version = versions[-1] if version is None else int(version)
+        if version not in versions:
+            raise ValueError('Model {} has no version {}, available: {}'.format(name, version, versions))
+
+        path = os.path.join(self.directory, name, str(version))
+        with open(os.path.join(path, _METADATA_FILE)) as file:
+            return ModelArtifact(name, version, path, json.load(file))
+
+    def find(self, name: str, **metadata) -> Optional[ModelArtifact]:
+        for version in reversed(self.get_versions(name)):
+            artifact = self.get(name, version)
+            if all(artifact.metadata.get(key) == value for key, value in metadata.items()):
+                return artifact
+
+        return None
+
+    def load(self, name: str, version: Optional[int] = None) -> Any:
+        return self.get(name, version).estimator
+
+    def get_versions(self, name: str) -> list[int]:
+        path = os.path.join(self.directory, name)
+        if not os.path.isdir(path):
+            return []
+
+        return sorted(
+            int(entry) for entry in os.listdir(path)
+            if entry.isdigit() and os.path.exists(os.path.join(path, entry, _METADATA_FILE))
+        )
+
+    def get_models(self) -> list[str]:
+        if not os.path.isdir(self.directory):
+            return []
+
+        return sorted(entry for entry in os.listdir(self.directory) if self.get_versions(entry))
+
+    def _create_version_directory(self, name: str) -> tuple[int, str]:
+        os.makedirs(os.path.join(self.directory, name), exist_ok=True)
+        existing = [int(entry) for entry in os.listdir(os.path.join(self.directory, name)) if entry.isdigit()]
+        version = max(existing, default=0) + 1
+        while True:
+            path = os.path.join(self.directory, name, str(version))
+            try:
+                os.mkdir(path)
+                return version, path
+            except FileExistsError:
+                version += 1
+
+
+def _get_scores(builder: AbstractBuilder, estimator: Any) -> dict:
+    scores = {}
+    if getattr(builder, 'X_train', None) is not None:
+        scores['train'] = estimator.score(builder.X_train, builder.y_train)
+    if getattr(builder, 'X_test', None) is not None:
+        scores['test'] = estimator.score(builder.X_test, builder.y_test)
+
+    return scores
+
+
+def _to_json(value):
+    return value.item() if hasattr(value, 'item') else str(value)
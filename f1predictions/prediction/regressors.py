@@ -1,7 +1,7 @@
+from typing import Optional
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.linear_model import LinearRegression
-import sys
 from sklearn.tree import DecisionTreeRegressor
 from f1predictions.prediction import AbstractDecisionTreeBasedRegressorBuilder, AbstractBuilder
 
@@ -24,29 +24,32 @@ class RandomForestRegressorBuilder(AbstractDecisionTreeBasedRegressorBuilder):
 
         return self
 
-    def create_regressor(self, max_n_optimizers: int = 8) -> 'RandomForestRegressorBuilder':
-        X, y, X_test, y_test = self._get_model()
-
+    def create_regressor(self, max_n_optimizers: int = 8, n_jobs: Optional[int] = None, halving: bool = False,
+                         incremental: bool = False, oob: bool = False) -> 'RandomForestRegressorBuilder':
         if self.criterion is None:
             raise ValueError('Criterion has not been set')
 
-        best_regressor = RandomForestRegressor(
-            criterion=self.criterion, n_estimators=1, random_state=self.random_state
-        )
+        if oob and not incremental:
+            raise ValueError('Out-of-bag scoring is only available in incremental mode')
 
-        best_score = -1 * sys.maxsize
+        if incremental:
+            if halving:
+                raise ValueError('Incremental mode cannot be combined with halving')
 
-        for i in range(1, max_n_optimizers):
-            regressor = RandomForestRegressor(
-                criterion=self.criterion, n_estimators=i, random_state=self.random_state
+            self.regressor = self._grow(
+                RandomForestRegressor(criterion=self.criterion, random_state=self.random_state, n_jobs=n_jobs),
+                range(1, max(max_n_optimizers, 2)),
+                oob
             )
 
-            regressor.fit(X, y)
-            score = regressor.score(X_test, y_test)
-            if score > best_score:
-                best_regressor, best_score = regressor, score
+            return self
 
-        self.regressor = best_regressor
+        self.regressor = self._search(
+            lambda i: RandomForestRegressor(criterion=self.criterion, n_estimators=i, random_state=self.random_state),
+            range(1, max(max_n_optimizers, 2)),
+            n_jobs,
+            halving
+        )
 
         return self
 
@@ -72,25 +75,17 @@ class DecisionTreeRegressorBuilder(AbstractDecisionTreeBasedRegressorBuilder):
 
         return self
 
-    def create_regressor(self, max_depth: int) -> 'DecisionTreeRegressorBuilder':
-        X, y, X_test, y_test = self._get_model()
-
+    def create_regressor(self, max_depth: int, n_jobs: Optional[int] = None,
+                         halving: bool = False) -> 'DecisionTreeRegressorBuilder':
         if self.criterion is None:
             raise ValueError('Criterion has not been set')
 
-        best_regressor = DecisionTreeRegressor(criterion=self.criterion, max_depth=1)
-
-        best_score = -1 * sys.maxsize
-
-        for i in range(1, max_depth):
-            regressor = DecisionTreeRegressor(criterion=self.criterion, max_depth=i)
-
-            regressor.fit(X, y)
-            score = regressor.score(X_test, y_test)
-            if score > best_score:
-                best_regressor, best_score = regressor, score
-
-        self.regressor = best_regressor
+        self.regressor = self._search(
+            lambda i: DecisionTreeRegressor(criterion=self.criterion, max_depth=i),
+            range(1, max(max_depth, 2)),
+            n_jobs,
+            halving
+        )
 
         return self
 
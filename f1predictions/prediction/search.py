@@ -0,0 +1,126 @@
+import math
+import time
+from typing import Any, Callable, Iterable, Optional
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+_OOB_ATTRIBUTES = ['oob_score_', 'oob_prediction_', 'oob_decision_function_']
+
+
+def search(create: Callable[[Any], Any], values: Iterable, X, y, X_test, y_test, n_jobs: Optional[int] = None,
+           halving: bool = False, factor: int = 3, min_resources: int = 20,
+           random_state: Optional[int] = None) -> tuple[Any, pd.DataFrame]:
+    values = list(values)
+    if not values:
+        raise ValueError('At least one hyper-parameter value is required')
+
+    if halving:
+        return _search_halving(create, values, X, y, X_test, y_test, n_jobs, factor, min_resources, random_state)
+
+    results = _fit_all(create, values, X, y, X_test, y_test, n_jobs)
+    best = _get_best(results)
+
+    return best[1], _to_table(values, results)
+
+
+def grow(estimator, values: Iterable[int], X, y, X_test, y_test, oob: bool = False) -> tuple[Any, pd.DataFrame]:
+    values = sorted(set(values))
+    if not values:
+        raise ValueError('At least one number of estimators is required')
+
+    estimator.set_params(warm_start=True, oob_score=oob)
+    best_score, best_state = None, None
+    rows = []
+
+    for n_estimators in values:
+        estimator.set_params(n_estimators=n_estimators)
+        start = time.perf_counter()
+        estimator.fit(X, y)
+        fit_time = time.perf_counter() - start
+
+        score = estimator.oob_score_ if oob else estimator.score(X_test, y_test)
+        rows.append((n_estimators, score, fit_time))
+        if best_score is None or score > best_score:
+            best_score, best_state = score, _get_forest_state(estimator)
+
+    _set_forest_state(estimator, best_state)
+    estimator.set_params(warm_start=False)
+
+    return estimator, pd.DataFrame(rows, columns=['param', 'score', 'fit_time'])
+
+
+def _get_forest_state(estimator) -> dict:
+    state = {'estimators_': list(estimator.estimators_)}
+    for attribute in _OOB_ATTRIBUTES:
+        if hasattr(estimator, attribute):
+            state[attribute] = getattr(estimator, attribute)
+
+    return state
+
+
+def _set_forest_state(estimator, state: dict):
+    for attribute, value in state.items():
+        setattr(estimator, attribute, value)
+    estimator.set_params(n_estimators=len(state['estimators_']))
+
+
+def _search_halving(create, values: list, X, y, X_test, y_test, n_jobs: Optional[int], factor: int,
+                    min_resources: int, random_state: Optional[int]) -> tuple[Any, pd.DataFrame]:
+    if factor < 2:
+        raise ValueError('Halving factor must be at least 2, {} given'.format(factor))
+
+    order = np.random.RandomState(random_state).permutation(len(X))
+    # neighbour estimators cannot be fitted on fewer samples than neighbours, so no round may use fewer
+    min_resources = max([min_resources] + [create(value).get_params().get('n_neighbors', 0) for value in values])
+    rounds = math.ceil(math.log(len(values), factor)) if len(values) > 1 else 0
+    # the first round still needs enough samples to rank the candidates meaningfully
+    rounds = min(rounds, int(math.log(len(X) / min_resources, factor))) if len(X) > min_resources else 0
+    candidates = values
+    tables = []
+
+    for round_number in range(rounds + 1):
+        # every round multiplies the training samples by the factor, the last one uses all of them
+        resources = max(1, len(X) // factor ** (rounds - round_number))
+        subset = order[:resources]
+        results = _fit_all(create, candidates, _take(X, subset), _take(y, subset), X_test, y_test, n_jobs)
+        tables.append(_to_table(candidates, results).assign(round=round_number, resources=resources))
+
+        if round_number == rounds:
+            return _get_best(results)[1], pd.concat(tables, ignore_index=True)
+
+        ranking = sorted(range(len(candidates)), key=lambda i: -results[i][0])
+        candidates = [candidates[i] for i in sorted(ranking[:math.ceil(len(candidates) / factor)])]
+
+
+def _fit_all(create, values: list, X, y, X_test, y_test, n_jobs: Optional[int]) -> list:
+    return Parallel(n_jobs=n_jobs)(delayed(_fit_and_score)(create(value), X, y, X_test, y_test) for value in values)
+
+
+def _fit_and_score(estimator, X, y, X_test, y_test) -> tuple[float, float, Any]:
+    start = time.perf_counter()
+    estimator.fit(X, y)
+    fit_time = time.perf_counter() - start
+
+    return estimator.score(X_test, y_test), fit_time, estimator
+
+
+def _get_best(results: list) -> tuple[float, Any]:
+    best_score, best_estimator = None, None
+    for score, _, estimator in results:
+        if best_score is None or score > best_score:
+            best_score, best_estimator = score, estimator
+
+    return best_score, best_estimator
+
+
+def _to_table(values: list, results: list) -> pd.DataFrame:
+    return pd.DataFrame({
+        'param': values,
+        'score': [score for score, _, _ in results],
+        'fit_time': [fit_time for _, fit_time, _ in results],
+    })
+
+
+def _take(values, indices: np.ndarray):
+    return values.iloc[indices] if hasattr(values, 'iloc') else np.asarray(values)[indices]
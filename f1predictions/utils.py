@@ -1,12 +1,16 @@
+from typing import Optional
 import numpy as np
 import pandas as pd
 
 from sqlalchemy import select
-from f1predictions.orm.config.database import get_session
+from f1predictions.orm.config.database import get_session, get_data_version
 from f1predictions.orm.entity import DriverConstructor, Round
 from f1predictions.orm.query import DriverRatingQuery
-from f1predictions.prediction.modelfactory import DriverRatingsModelFactory
+from f1predictions.prediction.modelfactory import DriverRatingsModelFactory, FEATURES
 from f1predictions.prediction.regressors import RandomForestRegressorBuilder
+from f1predictions.prediction.registry import ModelRegistry, ModelArtifact
+
+DRIVER_RATINGS_MODEL = 'driver_ratings'
 
 
 def convert_time_to_ms(time: str) -> int:
@@ -19,6 +23,12 @@ def convert_time_to_ms(time: str) -> int:
     return int(milliseconds) + (int(seconds) * 1000) + (int(minutes) * 60000)
 
 
+def convert_times_to_ms(times: pd.Series) -> pd.Series:
+    parts = times.astype(str).str.extract(r'^(\d+):(\d+)\.(\d+)$').fillna(0).astype('int64')
+
+    return parts[2] + (parts[1] * 1000) + (parts[0] * 60000)
+
+
 def create_drivers_constructors_dataframe() -> pd.DataFrame:
     Session = get_session()
     with Session() as session:
@@ -45,18 +55,36 @@ def create_rounds_dataframe() -> pd.DataFrame:
     })
 
 
-def find_driver_constructor_id(drivers_constructors_df: pd.DataFrame, driver_id: int, constructor_id: int,
-                               year: int) -> int:
-    df = (drivers_constructors_df
-          .where(drivers_constructors_df['driverId'] == driver_id)
-          .where(drivers_constructors_df['constructorId'] == constructor_id)
-          .dropna()
-          )
+class DriverConstructorLookup:
+    def __init__(self, drivers_constructors_df: pd.DataFrame, rounds_df: pd.DataFrame):
+        drivers_constructors_df = drivers_constructors_df.drop_duplicates(['driverId', 'constructorId', 'year'])
+        self._driver_constructor_index = pd.MultiIndex.from_frame(
+            drivers_constructors_df[['driverId', 'constructorId', 'year']].astype('int64')
+        )
+        self._driver_constructor_ids = drivers_constructors_df['id'].to_numpy(dtype='int64')
+        self._years = pd.Series(rounds_df['year'].to_numpy(dtype='int64'), index=rounds_df['id'].to_numpy(dtype='int64'))
+
+    def get_years(self, race_ids: pd.Series) -> pd.Series:
+        return race_ids.map(self._years)
 
-    if year is not None:
-        df = df.where(drivers_constructors_df['year'] == year)
+    def get_driver_constructor_ids(self, race_ids: pd.Series, driver_ids: pd.Series,
+                                   constructor_ids: pd.Series) -> np.ndarray:
+        keys = pd.DataFrame({
+            'driverId': driver_ids.to_numpy(),
+            'constructorId': constructor_ids.to_numpy(),
+            'year': self.get_years(race_ids).to_numpy(),
+        }).fillna(-1).astype('int64')
+        positions = self._driver_constructor_index.get_indexer(pd.MultiIndex.from_frame(keys))
 
-    return df['id'].dropna().unique()[0]
+        missing = positions == -1
+        if missing.any():
+            missing_keys = keys.assign(raceId=race_ids.to_numpy())[missing] \
+                .drop_duplicates()[['raceId', 'driverId', 'constructorId', 'year']]
+            raise ValueError('Unable to resolve driver constructor for {} rows, missing keys (raceId, driverId, '
+                             'constructorId, year): {}'.format(int(missing.sum()),
+                                                              list(missing_keys.itertuples(index=False, name=None))))
+
+        return self._driver_constructor_ids[positions]
 
 
 def get_driver_ratings_predictor(
@@ -65,9 +93,7 @@ def get_driver_ratings_predictor(
 ) -> RandomForestRegressorBuilder:
     ratings = driver_rating_query.get_drivers_ratings()
 
-    model = [driver_ratings_model_factory.create_driver_ratings_model(i.driver_id, i.year) for i in ratings]
-
-    X = np.array([i.to_list() for i in model])
+    X = driver_ratings_model_factory.build_feature_matrix([(i.driver_id, i.year) for i in ratings])
     y = np.array([i.rating for i in ratings])
 
     return RandomForestRegressorBuilder() \
@@ -77,4 +103,17 @@ def get_driver_ratings_predictor(
         .create_regressor(12)
 
 
-
+def get_driver_ratings_model(
+        driver_rating_query: DriverRatingQuery,
+        driver_ratings_model_factory: DriverRatingsModelFactory,
+        registry: Optional[ModelRegistry] = None
+) -> ModelArtifact:
+    registry = registry or ModelRegistry()
+    data_version = get_data_version()
+
+    artifact = registry.find(DRIVER_RATINGS_MODEL, data_version=data_version)
+    if artifact is None:
+        predictor = get_driver_ratings_predictor(driver_rating_query, driver_ratings_model_factory)
+        artifact = registry.save(DRIVER_RATINGS_MODEL, predictor, FEATURES, data_version)
+
+    return artifact
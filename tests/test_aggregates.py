@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from f1predictions.etl.aggregates import compute_views
+from f1predictions.orm.dbal.featurestore import DRIVERS_ROUNDS_RESULTS, OPPONENTS_ROUNDS_RESULTS, \
+    DRIVERS_SEASONS_RESULTS, OPPONENTS_SEASONS_RESULTS
+
+# drivers 1, 2 and 3 share constructor 10 in 2020, driver 4 drives alone for constructor 20
+_DRIVER_CONSTRUCTORS = pd.DataFrame({
+    'id': [101, 102, 103, 104],
+    'driver_id': [1, 2, 3, 4],
+    'constructor_id': [10, 10, 10, 20],
+    'year': [2020] * 4,
+})
+_QUALIFYING_RESULTS = pd.DataFrame({
+    'round_id': [1, 2, 1, 2, 1],
+    'driver_constructor_id': [101, 101, 102, 103, 104],
+    'position': [1, 3, 2, 4, 5],
+    'q2': [1.0, 1.0, 1.0, np.nan, 0.0],
+    'q3': [1.0, np.nan, 1.0, np.nan, np.nan],
+})
+_DRIVERS_RESULTS = pd.DataFrame({
+    'round_id': [1, 2, 1, 2, 1],
+    'driver_constructor_id': [101, 101, 102, 103, 104],
+    'position': [1.0, 2.0, np.nan, 5.0, 4.0],
+    'status_id': [1, 2, 3, 1, 3],
+})
+_DRIVERS_STANDINGS = pd.DataFrame({
+    'driver_constructor_id': [101, 101, 102, 103, 104],
+    'points': [7.0, 25.0, 10.0, 5.0, 8.0],
+    'position': [2, 1, 3, 5, 4],
+    'wins': [0, 1, 0, 0, 0],
+})
+_STATUSES = pd.DataFrame({'id': [1, 2, 3], 'status': ['Finished', '+1 Lap', 'Engine']})
+
+
+@pytest.fixture(scope='module')
+def views() -> dict[str, pd.DataFrame]:
+    computed = compute_views(_DRIVER_CONSTRUCTORS, _DRIVERS_RESULTS, _QUALIFYING_RESULTS, _DRIVERS_STANDINGS,
+                             _STATUSES)
+
+    return {name: view.set_index('driver_id') for name, view in computed.items()}
+
+
+def test_drivers_rounds_results(views):
+    view = views[DRIVERS_ROUNDS_RESULTS]
+
+    assert list(view.index) == [1, 2, 3, 4]
+    assert view.loc[1, 'avg_qualifying_position'] == pytest.approx(2.0)
+    assert view.loc[1, ['q2_appearances', 'q3_appearances', 'pole_positions', 'podiums', 'dnfs']].tolist() == \
+        [2, 1, 1, 2, 0]
+    # the view sums the position itself, so a second place counts 2
+    assert view.loc[2, 'front_row_second'] == 2
+    # retired from the race, unlike a lapped finish
+    assert view.loc[2, 'dnfs'] == 1
+    assert view.loc[4, ['q2_appearances', 'dnfs']].tolist() == [0, 1]
+
+
+def test_opponents_rounds_results_fan_out_to_every_teammate(views):
+    view = views[OPPONENTS_ROUNDS_RESULTS]
+
+    # driver 4 has no teammate
+    assert list(view.index) == [1, 2, 3]
+    assert view.loc[1, 'avg_qualifying_position'] == pytest.approx(3.0)
+    assert view.loc[1, ['q2_appearances', 'front_row_second', 'podiums', 'dnfs']].tolist() == [1, 2, 0, 1]
+    # an average over the three results of drivers 1 and 3, not an average of their averages
+    assert view.loc[2, 'avg_qualifying_position'] == pytest.approx(8 / 3)
+    assert view.loc[2, ['q2_appearances', 'q3_appearances', 'pole_positions', 'podiums', 'dnfs']].tolist() == \
+        [2, 1, 1, 2, 0]
+
+
+def test_seasons_results(views):
+    drivers, opponents = views[DRIVERS_SEASONS_RESULTS], views[OPPONENTS_SEASONS_RESULTS]
+
+    assert drivers.loc[1, ['season_points', 'season_position', 'wins']].tolist() == pytest.approx([32.0, 1.5, 1])
+    assert drivers.loc[4, ['season_points', 'season_position', 'wins']].tolist() == pytest.approx([8.0, 4.0, 0])
+    assert list(opponents.index) == [1, 2, 3]
+    assert opponents.loc[2, ['season_points', 'season_position', 'wins']].tolist() == pytest.approx([37.0, 8 / 3, 1])
+    assert opponents.loc[3, ['season_points', 'season_position', 'wins']].tolist() == pytest.approx([42.0, 2.0, 1])
@@ -0,0 +1,14 @@
+from f1predictions.etl import instrumentation
+from f1predictions.etl.instrumentation import stage, format_summary
+
+
+def test_stages_are_recorded_without_memory_when_rss_is_unavailable(monkeypatch):
+    monkeypatch.setattr(instrumentation, 'get_rss', lambda: None)
+
+    with stage('outer', 3) as outer:
+        with stage('inner') as inner:
+            pass
+
+    assert outer.to_dict()['peak_rss_mb'] is None
+    assert inner.peak_rss is None
+    assert 'inner' in format_summary([outer, inner])
@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+import f1predictions.orm.config.database as database
+from f1predictions.etl.loader import load_frame, upsert_frames
+from f1predictions.orm.entity import Status
+
+
+@pytest.fixture
+def statuses(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, '_CONFIG_OVERRIDES', {})
+    database.configure_database(backend='sqlite', url='sqlite:///{}'.format(tmp_path / 'f1predictions.db'))
+    Status.__table__.create(database.get_engine())
+    load_frame(pd.DataFrame({'id': [1, 2, 3, 4], 'status': ['Finished', 'Engine', 'Gearbox', '+1 Lap']}), Status)
+    yield
+    database.dispose_engine()
+
+
+def _read_statuses() -> pd.DataFrame:
+    return pd.read_sql('SELECT id, status FROM status ORDER BY id', database.get_engine())
+
+
+def test_upsert_frames_writes_changed_and_new_rows_only(statuses):
+    chunks = [
+        pd.DataFrame({'id': [1, 2], 'status': ['Finished', 'Engine failure']}),
+        pd.DataFrame({'id': [4, 5], 'status': ['+1 Lap', 'Collision']}),
+    ]
+
+    changed = upsert_frames(iter(chunks), Status)
+
+    assert [2, 5] == changed['id'].tolist()
+    assert ['Finished', 'Engine failure', 'Gearbox', '+1 Lap', 'Collision'] == _read_statuses()['status'].tolist()
+
+
+def test_upsert_frames_keeps_stored_rows_outside_the_chunks(statuses):
+    changed = upsert_frames([pd.DataFrame({'id': [3], 'status': ['Gearbox']})], Status)
+
+    assert changed.empty
+    assert [1, 2, 3, 4] == _read_statuses()['id'].tolist()
@@ -0,0 +1,90 @@
+import pytest
+
+import f1predictions.orm.query as query
+from f1predictions.orm.query import QueryCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(query.time, 'monotonic', clock)
+
+    return clock
+
+
+@pytest.fixture
+def version(monkeypatch) -> list[int]:
+    version = [1]
+    monkeypatch.setattr(query, 'get_data_version', lambda: version[0])
+
+    return version
+
+
+def test_evicts_least_recently_used_entry(clock, version):
+    cache = QueryCache(max_size=2)
+    cache.put(('a',), 1)
+    cache.put(('b',), 2)
+    assert 1 == cache.get(('a',))
+
+    cache.put(('c',), 3)
+
+    assert cache.get(('b',)) is None
+    assert 1 == cache.get(('a',))
+    assert 3 == cache.get(('c',))
+    assert 1 == cache.get_stats()['evictions']
+
+
+def test_expires_entries_after_ttl(clock, version):
+    cache = QueryCache(ttl=10.0)
+    cache.put(('a',), 1)
+
+    clock.now += 9.0
+    assert 1 == cache.get(('a',))
+
+    clock.now += 2.0
+    assert 'expired' == cache.get(('a',), 'expired')
+    assert 0 == cache.get_stats()['size']
+
+
+def test_clears_entries_when_data_version_changes(clock, version):
+    cache = QueryCache(check_interval=1.0)
+    cache.put(('a',), 1)
+
+    version[0] = 2
+    assert 1 == cache.get(('a',))
+
+    clock.now += 1.0
+    assert cache.get(('a',)) is None
+    assert 2 == cache.get_stats()['version']
+
+
+def test_invalidate_clears_entries(clock, version):
+    cache = QueryCache()
+    cache.put(('a',), 1)
+
+    cache.invalidate()
+
+    assert cache.get(('a',)) is None
+
+
+def test_get_or_load_caches_loaded_values(clock, version):
+    cache = QueryCache()
+    calls = []
+
+    def load():
+        calls.append(1)
+
+        return None
+
+    assert cache.get_or_load(('a',), load) is None
+    assert cache.get_or_load(('a',), load) is None
+    assert 1 == len(calls)
+    assert {'hits': 1, 'misses': 1} == {key: cache.get_stats()[key] for key in ('hits', 'misses')}
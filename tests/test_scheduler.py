@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import MetaData, Table, Column, Integer, ForeignKey
+
+from f1predictions.etl.scheduler import LoadStep, get_dependencies, run_steps
+
+_METADATA = MetaData()
+_TABLES = {
+    'driver': Table('driver', _METADATA, Column('id', Integer, primary_key=True)),
+    'constructor': Table('constructor', _METADATA, Column('id', Integer, primary_key=True)),
+    'round': Table('round', _METADATA, Column('id', Integer, primary_key=True)),
+    'driver_constructor': Table(
+        'driver_constructor', _METADATA, Column('id', Integer, primary_key=True),
+        Column('driver_id', ForeignKey('driver.id')), Column('constructor_id', ForeignKey('constructor.id'))
+    ),
+    'result': Table(
+        'result', _METADATA, Column('id', Integer, primary_key=True),
+        Column('driver_constructor_id', ForeignKey('driver_constructor.id')), Column('round_id', ForeignKey('round.id'))
+    ),
+}
+
+
+def _step(table: str, reads: tuple = ()) -> LoadStep:
+    model = type(table, (), {'__table__': _TABLES[table]})
+
+    return LoadStep(table, model, lambda: None, reads)
+
+
+def test_dependencies_follow_foreign_keys_and_reads():
+    steps = [_step('result'), _step('driver_constructor', reads=('round',)), _step('driver'), _step('round')]
+
+    assert {
+        'result': {'driver_constructor', 'round'},
+        'driver_constructor': {'driver', 'round'},
+        'driver': set(),
+        'round': set(),
+    } == get_dependencies(steps)
+
+
+def test_steps_run_after_their_dependencies():
+    steps = [_step('result'), _step('driver_constructor', reads=('round',)), _step('constructor'), _step('driver'),
+             _step('round')]
+    order = []
+    lock = threading.Lock()
+
+    def run(step: LoadStep):
+        with lock:
+            order.append(step.table)
+
+    timings = run_steps(steps, run, max_parallelism=2)
+
+    assert sorted(order) == sorted(step.table for step in steps)
+    assert 5 == len(timings)
+    for table, dependencies in get_dependencies(steps).items():
+        assert all(order.index(dependency) < order.index(table) for dependency in dependencies)
+
+
+def test_circular_dependency_raises():
+    steps = [_step('driver_constructor', reads=('result',)), _step('result'), _step('driver'), _step('constructor'),
+             _step('round')]
+    ran = []
+
+    with pytest.raises(ValueError, match='Circular dependency between tables: driver_constructor, result'):
+        run_steps(steps, lambda step: ran.append(step.table), max_parallelism=1)
+
+    assert {'driver', 'constructor', 'round'} == set(ran)
+
+
+def test_failing_step_cancels_pending_steps():
+    steps = [_step('driver'), _step('constructor'), _step('round'), _step('driver_constructor'), _step('result')]
+    ran = []
+
+    def run(step: LoadStep):
+        if 'driver' == step.table:
+            raise RuntimeError('broken step')
+        ran.append(step.table)
+        time.sleep(0.05)
+
+    with pytest.raises(RuntimeError, match='broken step'):
+        run_steps(steps, run, max_parallelism=1)
+
+    # the single worker may already have taken the next queued step, every other one is cancelled
+    assert len(ran) <= 1
+    assert 'driver_constructor' not in ran and 'result' not in ran
+
+
+def test_callbacks_run_on_the_calling_thread():
+    steps = [_step('result'), _step('driver_constructor'), _step('constructor'), _step('driver'), _step('round')]
+    events = []
+
+    run_steps(steps, lambda step: time.sleep(0.01), max_parallelism=3,
+              on_start=lambda step: events.append(('start', step.table, threading.current_thread())),
+              on_finish=lambda timing: events.append(('finish', timing.step.table, threading.current_thread())))
+
+    assert {threading.current_thread()} == {thread for _, _, thread in events}
+    for table in ['result', 'driver_constructor', 'constructor', 'driver', 'round']:
+        assert events.index(('start', table, threading.current_thread())) < \
+            events.index(('finish', table, threading.current_thread()))
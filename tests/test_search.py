@@ -0,0 +1,31 @@
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+
+from f1predictions.prediction.search import search
+
+
+def _get_data(size: int) -> tuple[np.ndarray, np.ndarray]:
+    random = np.random.RandomState(0)
+
+    return random.rand(size, 3), random.randint(0, 3, size)
+
+
+def test_halving_search_fits_knn_with_more_neighbours_than_the_first_round_samples():
+    X, y = _get_data(66)
+
+    best, results = search(lambda i: KNeighborsClassifier(n_neighbors=i), range(1, 60), X, y, X, y, halving=True,
+                           random_state=1)
+
+    assert isinstance(best, KNeighborsClassifier)
+    assert (results['param'] <= results['resources']).all()
+
+
+def test_halving_search_runs_several_rounds_on_small_neighbour_counts():
+    X, y = _get_data(200)
+
+    best, results = search(lambda i: KNeighborsClassifier(n_neighbors=i), range(1, 10), X, y, X, y, halving=True,
+                           random_state=1)
+
+    assert results['round'].nunique() > 1
+    assert results.loc[results['round'] == results['round'].max(), 'resources'].unique().tolist() == [200]
+    assert best.n_neighbors in results.loc[results['round'] == results['round'].max(), 'param'].tolist()
@@ -0,0 +1,51 @@
+from sqlalchemy import create_engine, text
+
+from f1predictions.orm.config.statements import normalize_statement, register_statement_listeners, \
+    get_statement_stats, reset_statement_stats
+
+
+def test_normalize_statement_replaces_literals():
+    assert 'SELECT * FROM driver WHERE id = ? AND name = ? AND points > ?' == normalize_statement(
+        "SELECT * FROM driver WHERE id = 42 AND name = 'O''Brien' AND points > 1.5"
+    )
+
+
+def test_normalize_statement_replaces_bound_parameters():
+    assert 'SELECT * FROM driver WHERE id = ? AND year = ? AND round = ? AND rank = ?' == normalize_statement(
+        'SELECT * FROM driver WHERE id = %(id_1)s AND year = %s AND round = :round AND rank = $1'
+    )
+
+
+def test_normalize_statement_collapses_in_lists():
+    assert normalize_statement('SELECT * FROM driver WHERE id IN (1, 2, 3)') == \
+        normalize_statement('SELECT * FROM driver WHERE id IN (%(id_1_1)s, %(id_1_2)s)') == \
+        'SELECT * FROM driver WHERE id IN (...)'
+
+
+def test_normalize_statement_keeps_type_casts():
+    assert 'SELECT name::text, ?::integer FROM driver WHERE id = ?' == normalize_statement(
+        "SELECT name::text, '7'::integer FROM driver WHERE id = :id"
+    )
+
+
+def test_normalize_statement_collapses_whitespace():
+    assert 'SELECT id FROM driver WHERE year = ?' == normalize_statement('\n    SELECT id\n    FROM driver\n'
+                                                                         '    WHERE year = 2020\n')
+
+
+def test_statement_stats_count_fetched_rows_on_sqlite():
+    engine = create_engine('sqlite://')
+    register_statement_listeners(engine)
+    with engine.connect() as conn:
+        conn.execute(text('CREATE TABLE driver (id INTEGER)'))
+        conn.execute(text('INSERT INTO driver VALUES (1), (2), (3)'))
+        reset_statement_stats()
+        conn.execute(text('SELECT id FROM driver')).fetchall()
+        conn.execute(text('SELECT id FROM driver WHERE id > 1')).first()
+        conn.execute(text('UPDATE driver SET id = id + 10 WHERE id > 1'))
+
+    rows = {stats['statement']: stats['rows'] for stats in get_statement_stats()}
+    reset_statement_stats()
+
+    assert {'SELECT id FROM driver': 3, 'SELECT id FROM driver WHERE id > ?': 1,
+            'UPDATE driver SET id = id + ? WHERE id > ?': 2} == rows